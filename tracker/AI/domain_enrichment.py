@@ -4,6 +4,7 @@ Domain Enrichment Processor - FIXED AUTH HEADERS
 
 This script extracts domains from AI.json that haven't been processed yet,
 sends them to OpenAI API for enrichment, and saves the results to processed_AI.json.
+With --stdin the entities are read as NDJSON from standard input instead of AI.json.
 """
 
 import json
@@ -32,6 +33,7 @@ logger = logging.getLogger(__name__)
 parser = argparse.ArgumentParser(description="Domain enrichment processor")
 parser.add_argument("--yes", action="store_true", help="Automatically confirm all batches")
 parser.add_argument("--output", type=str, help="Output directory for processed_AI.json")
+parser.add_argument("--stdin", action="store_true", help="Read entities as NDJSON from stdin instead of AI.json")
 args = parser.parse_args()
 
 # Determine output directory
@@ -56,7 +58,7 @@ file_handler.setFormatter(file_formatter)
 logger.addHandler(file_handler)
 
 logger.info("====== DOMAIN ENRICHMENT STARTING ======")
-logger.info(f"Input file: {INPUT_FILE}")
+logger.info(f"Input file: {'stdin (NDJSON)' if args.stdin else INPUT_FILE}")
 logger.info(f"Output file: {PROCESSED_FILE}")
 logger.info(f"Log file: {LOG_FILE}")
 
@@ -91,6 +93,23 @@ def load_json_file(file_path: Path) -> Dict:
         logger.error(traceback.format_exc())
         return {"entities": []}
 
+def load_ndjson_stream(stream) -> Dict:
+    """Read entities from a stream containing one JSON object per line."""
+    logger.info("Reading entities from stdin...")
+    
+    entities = []
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entities.append(json.loads(line))
+        except json.JSONDecodeError:
+            logger.warning(f"Skipping invalid JSON on line {line_number}")
+    
+    logger.info(f"Read {len(entities)} entities from stdin")
+    return {"entities": entities}
+
 def save_json_file(data: Dict, file_path: Path) -> bool:
     """Save data to a JSON file."""
     logger.info(f"Saving to file: {file_path}")
@@ -256,7 +275,10 @@ Return a valid JSON array with an object for each domain."""
 def process_domains():
     """Process domains from AI.json and update processed_AI.json."""
     # Load input and processed data
-    input_data = load_json_file(INPUT_FILE)
+    if args.stdin:
+        input_data = load_ndjson_stream(sys.stdin)
+    else:
+        input_data = load_json_file(INPUT_FILE)
     processed_data = load_json_file(PROCESSED_FILE)
     if not processed_data:
         processed_data = {"entities": [], "total_count": 0, "last_updated": ""}
@@ -4,9 +4,12 @@ Entity Field Extractor Script
 
 This script extracts specific fields (id, domain, ransomware_group, group_key) 
 from final_entities.json and creates a new AI.json file in the AI directory.
+With --ndjson the entities are written to stdout as one JSON object per line
+instead, so they can be piped straight into domain_enrichment.py --stdin.
 """
 
 import os
+import sys
 import json
 import logging
 import argparse
@@ -22,6 +25,7 @@ logger = logging.getLogger(__name__)
 # Parse command line arguments
 parser = argparse.ArgumentParser(description="Extract AI fields from entities")
 parser.add_argument("--output", type=str, help="Output directory for AI.json")
+parser.add_argument("--ndjson", action="store_true", help="Write extracted entities to stdout as NDJSON instead of AI.json")
 args = parser.parse_args()
 
 # Define paths using Path for cross-platform compatibility
@@ -86,6 +90,47 @@ def save_json_file(data, file_path):
         logger.error(f"Error saving to {file_path}: {e}")
         return False
 
+def iter_extracted_entities(entities):
+    """Yield entities reduced to the fields needed for AI processing."""
+    for entity in entities:
+        # Skip entities missing required fields
+        if not all(field in entity for field in ["id", "domain"]):
+            continue
+        
+        # Create a new entity with only the required fields
+        yield {
+            "id": entity["id"],
+            "domain": entity["domain"],
+            "ransomware_group": entity.get("ransomware_group"),
+            "group_key": entity.get("group_key")
+        }
+
+def stream_entity_fields():
+    """
+    Write the extracted entities from final_entities.json to stdout as NDJSON,
+    one entity per line, without creating AI.json.
+    
+    Returns the number of entities streamed (0 for an empty database), or None
+    if the input file is missing or invalid.
+    """
+    if not INPUT_FILE.exists():
+        logger.error(f"Input file does not exist: {INPUT_FILE}")
+        return None
+    
+    data = load_json_file(INPUT_FILE)
+    if not data or "entities" not in data:
+        logger.error("No valid entities found in the input file")
+        return None
+    
+    count = 0
+    for entity in iter_extracted_entities(data["entities"]):
+        sys.stdout.write(json.dumps(entity, ensure_ascii=False) + "\n")
+        count += 1
+    sys.stdout.flush()
+    
+    logger.info(f"Streamed {count} entities to stdout")
+    return count
+
 def extract_entity_fields():
     """
     Extract id, domain, ransomware_group, and group_key fields from final_entities.json
@@ -125,20 +170,7 @@ def extract_entity_fields():
         return False
     
     # Extract required fields
-    extracted_entities = []
-    for entity in data["entities"]:
-        # Skip entities missing required fields
-        if not all(field in entity for field in ["id", "domain"]):
-            continue
-        
-        # Create a new entity with only the required fields
-        extracted_entity = {
-            "id": entity["id"],
-            "domain": entity["domain"],
-            "ransomware_group": entity.get("ransomware_group"),
-            "group_key": entity.get("group_key")
-        }
-        extracted_entities.append(extracted_entity)
+    extracted_entities = list(iter_extracted_entities(data["entities"]))
     
     # Create new JSON structure
     output_data = {
@@ -154,8 +186,13 @@ def extract_entity_fields():
 if __name__ == "__main__":
     logger.info("Starting entity field extraction")
     logger.info(f"Looking for input file at: {INPUT_FILE}")
-    success = extract_entity_fields()
+    if args.ndjson:
+        success = stream_entity_fields() is not None
+    else:
+        success = extract_entity_fields()
     if success:
-        logger.info(f"Successfully extracted fields to {OUTPUT_FILE}")
+        logger.info(f"Successfully extracted fields to {'stdout' if args.ndjson else OUTPUT_FILE}")
     else:
-        logger.error("Failed to extract entity fields")
\ No newline at end of file
+        logger.error("Failed to extract entity fields")
+        # A non-zero exit code lets run_ai_processing.py tell a failure from an empty result
+        sys.exit(1)
\ No newline at end of file
@@ -290,13 +290,17 @@ def browse_with_selenium(driver, url, site_config, wait_time=None):
         logger.info(f"Waiting {wait_time:.2f} seconds...")
         time.sleep(wait_time)
         
+        # Fetch the page source once: each page_source access serializes the whole DOM
+        # through the WebDriver protocol
+        html_content = driver.page_source
+        
         # Check if the page has content we expect based on verification type
         if verification_type == 'text':
-            if verification_value not in driver.page_source:
+            if verification_value not in html_content:
                 logger.warning(f"Text '{verification_value}' not found in page for {site_name}, might not be the correct site")
                 return None
         elif verification_type == 'class':
-            if f'class="{verification_value}"' not in driver.page_source and f"class='{verification_value}'" not in driver.page_source:
+            if f'class="{verification_value}"' not in html_content and f"class='{verification_value}'" not in html_content:
                 logger.warning(f"Class '{verification_value}' not found in page for {site_name}, might not be the correct site")
                 return None
         elif verification_type == 'selector':
@@ -306,7 +310,7 @@ def browse_with_selenium(driver, url, site_config, wait_time=None):
                 logger.warning(f"Selector '{verification_value}' not found in page for {site_name}, might not be the correct site")
                 return None
         
-        return driver.page_source
+        return html_content
     
     except Exception as e:
         logger.error(f"Error visiting {url}: {e}")
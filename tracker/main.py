@@ -6,6 +6,8 @@ import argparse
 import json
 import sys
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add the project root to the path
@@ -18,6 +20,8 @@ from tracker.utils.logging_utils import logger
 from tracker.utils.file_utils import load_json
 from tracker.browser.tor_browser import setup_tor_browser, test_tor_connection
 from tracker.scraper.generic_parser import GenericParser
+from tracker.scraper.base_parser import compact_new_entities
+from tracker.scraper.snapshot_sink import SnapshotSink
 from tracker.config.config_handler import ConfigHandler
 
 # Constants with relative paths
@@ -27,6 +31,9 @@ PER_GROUP_DIR = os.path.join(OUTPUT_DIR, "per_group")  # New directory for per-g
 HTML_SNAPSHOTS_DIR = os.path.join(PROJECT_ROOT, "data", "snapshots", "html_snapshots")
 LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
 
+# Delay between starting sites when scraping in parallel, so Tor circuits are not all built at once
+SITE_START_STAGGER = 0.1
+
 # Ensure directories exist
 os.makedirs(CONFIG_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -110,8 +117,57 @@ def process_site(driver, site_config):
         logger.error(f"Error processing {site_name}: {e}")
         return False
 
+def process_sites_parallel(site_configs, max_workers, headless):
+    """
+    Process sites concurrently, each worker thread using its own browser.
+    
+    Args:
+        site_configs: List of site configuration dictionaries
+        max_workers: Number of sites processed at the same time
+        headless: Whether the worker browsers run in headless mode
+    
+    Returns:
+        List of booleans, the result of process_site for each site in order
+    """
+    thread_state = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+    
+    def process_in_worker(site_config):
+        # A WebDriver session cannot be shared between threads, so each worker opens its own
+        driver = getattr(thread_state, 'driver', None)
+        if driver is None:
+            driver = setup_tor_browser(headless=headless)
+            thread_state.driver = driver
+            with drivers_lock:
+                drivers.append(driver)
+        return process_site(driver, site_config)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="site") as executor:
+            futures = []
+            for i, site_config in enumerate(site_configs):
+                if i:
+                    time.sleep(SITE_START_STAGGER)
+                futures.append(executor.submit(process_in_worker, site_config))
+            
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error processing site in worker thread: {e}")
+                    results.append(False)
+            return results
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"Error closing worker browser: {e}")
+
 def main(target_sites=None, skip_processing=False, disable_telegram=False, 
-         browser_config_overrides=None, constant_monitoring=False):
+         browser_config_overrides=None, constant_monitoring=False, parallel_sites=1):
     """
     Main function to scrape multiple sites based on configuration files
     
@@ -122,6 +178,7 @@ def main(target_sites=None, skip_processing=False, disable_telegram=False,
         browser_config_overrides (list): List of browser config overrides in format "key.subkey=value"
         constant_monitoring (bool): If True, only send notifications when new entities are found
                                    and trigger AI processing for new entities
+        parallel_sites (int): Number of sites to scrape at the same time, each with its own browser
     """
     logger.info(f"Starting ransomware leak site tracker at {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"Constant monitoring mode: {constant_monitoring}")
@@ -158,6 +215,7 @@ def main(target_sites=None, skip_processing=False, disable_telegram=False,
                 
     # Initialize tracking variables for the final notification
     sites_processed = []
+    processed_site_keys = []
     total_entities_found = 0
     new_entities_found = 0
     
@@ -229,39 +287,39 @@ def main(target_sites=None, skip_processing=False, disable_telegram=False,
             logger.error("Cannot connect to Tor. Make sure Tor is running on port 9050.")
             return
         
-        # Process each requested site
+        # Load the configuration of each requested site
+        site_configs = []
         for site_key in target_sites:
             site_config = config_handler.get_site_config(site_key)
             if site_config:
                 # Add site to processed list for the notification
                 site_name = site_config.get('site_name', site_key)
                 sites_processed.append(site_name)
-                
-                # Process the site
-                success = process_site(driver, site_config)
-                
-                # Count entities if successfully processed
-                if success:
-                    try:
-                        # Get entity counts for this site - use PER_GROUP_DIR
-                        json_file = site_config.get("json_file", f"{site_key}_entities.json")
-                        entity_data = load_json(json_file, PER_GROUP_DIR)
-                        site_total = len(entity_data.get('entities', []))
-                        total_entities_found += site_total
-                        
-                        # Try to count new entities from the central file
-                        new_entities_file = os.path.join(OUTPUT_DIR, "new_entities.json")
-                        if os.path.exists(new_entities_file):
-                            with open(new_entities_file, 'r') as f:
-                                new_entities_data = json.load(f)
-                                new_entities = [e for e in new_entities_data.get('entities', []) 
-                                              if e.get('group_key') == site_key]
-                                new_entities_found += len(new_entities)
-                    except Exception as e:
-                        logger.error(f"Error counting entities for site {site_key}: {e}")
+                site_configs.append((site_key, site_config))
             else:
                 logger.error(f"Configuration for site {site_key} not found or invalid")
         
+        # Process the sites, one at a time with the main browser or in parallel with worker browsers
+        if parallel_sites > 1 and len(site_configs) > 1:
+            logger.info(f"Processing {len(site_configs)} sites with {parallel_sites} parallel workers")
+            results = process_sites_parallel([site_config for _, site_config in site_configs],
+                                             parallel_sites, in_github_actions)
+        else:
+            results = (process_site(driver, site_config) for _, site_config in site_configs)
+        
+        for (site_key, site_config), success in zip(site_configs, results):
+            # Count entities if successfully processed
+            if success:
+                try:
+                    # Get entity counts for this site - use PER_GROUP_DIR
+                    json_file = site_config.get("json_file", f"{site_key}_entities.json")
+                    entity_data = load_json(json_file, PER_GROUP_DIR)
+                    site_total = len(entity_data.get('entities', []))
+                    total_entities_found += site_total
+                    processed_site_keys.append(site_key)
+                except Exception as e:
+                    logger.error(f"Error counting entities for site {site_key}: {e}")
+        
     except Exception as e:
         logger.error(f"Error in main function: {e}")
     finally:
@@ -269,6 +327,29 @@ def main(target_sites=None, skip_processing=False, disable_telegram=False,
         if driver:
             driver.quit()
         
+        # Write one snapshot file for all new entities found during this run
+        SnapshotSink.instance().flush()
+        
+        # Fold the new entities logged by the parsers into new_entities.json in one write
+        compact_new_entities(OUTPUT_DIR)
+        
+        # Wait for the queued new entity notifications before the completion notification
+        try:
+            from tracker.telegram_bot.notifier import flush_notifications
+            flush_notifications()
+        except ImportError:
+            pass
+        
+        # Count new entities for the processed sites from the central file
+        if processed_site_keys and os.path.exists(new_entities_file):
+            try:
+                with open(new_entities_file, 'r') as f:
+                    new_entities_data = json.load(f)
+                new_entities_found = sum(1 for e in new_entities_data.get('entities', [])
+                                         if e.get('group_key') in processed_site_keys)
+            except Exception as e:
+                logger.error(f"Error counting new entities: {e}")
+        
         # In constant monitoring mode, check if we found new entities
         found_new_entities = False
         if constant_monitoring:
@@ -340,6 +421,8 @@ if __name__ == "__main__":
     parser.add_argument('--no-telegram', action='store_true', help='Disable Telegram notifications')
     parser.add_argument('--constant-monitoring', action='store_true', 
                        help='Only send notifications for new entities and run AI processing when new entities are found')
+    parser.add_argument('--parallel-sites', type=int, default=1,
+                       help='Number of sites to scrape at the same time, each with its own browser (default: 1)')
     
     # Configuration override arguments - only browser config is available now
     parser.add_argument('--browser-config', type=str, nargs='+', 
@@ -348,4 +431,5 @@ if __name__ == "__main__":
     args = parser.parse_args()
     
     # Run the main function with the parsed arguments
-    main(args.sites, args.no_process, args.no_telegram, args.browser_config, args.constant_monitoring)
+    main(args.sites, args.no_process, args.no_telegram, args.browser_config, args.constant_monitoring,
+         args.parallel_sites)
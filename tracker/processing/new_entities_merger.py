@@ -10,7 +10,8 @@ This script:
 """
 
 import os
-import json
+import sys
+import orjson
 import datetime
 import re
 import requests
@@ -27,6 +28,9 @@ logger = logging.getLogger(__name__)
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
+# Make the tracker package importable when the script is run directly
+sys.path.append(str(PROJECT_ROOT))
+from tracker.utils.file_utils import read_json
 INPUT_DIR = os.path.join(PROJECT_ROOT, "data", "output")
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "data", "processed")
 
@@ -124,8 +128,7 @@ def get_current_utc_time():
 def load_json_file(file_path):
     """Load a JSON file and return its contents."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(file_path)
     except Exception as e:
         logger.error(f"Error loading {file_path}: {e}")
         return None
@@ -133,8 +136,8 @@ def load_json_file(file_path):
 def save_json_file(data, file_path):
     """Save data to a JSON file."""
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         logger.info(f"Successfully saved to {file_path}")
         return True
     except Exception as e:
@@ -13,7 +13,9 @@ ensures no duplicate entities are added to the final archive.
 """
 
 import os
+import sys
 import json
+import orjson
 import datetime
 import re
 import requests
@@ -31,6 +33,9 @@ logger = logging.getLogger(__name__)
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
+# Make the tracker package importable when the script is run directly
+sys.path.append(str(PROJECT_ROOT))
+from tracker.utils.file_utils import read_json
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, "data", "output")
 PER_GROUP_DIR = os.path.join(OUTPUT_DIR, "per_group")
 
@@ -111,8 +116,7 @@ def get_current_utc_time():
 def load_json_file(file_path):
     """Load a JSON file and return its contents."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_json(file_path)
     except FileNotFoundError:
         logger.info(f"File not found: {file_path}")
         return None
@@ -138,8 +142,8 @@ def save_json_file(data, file_path):
         logger.info(f"Ensuring directory exists: {parent_dir}")
         
         # Write the new data
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        with open(file_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         logger.info(f"Successfully saved data to {file_path}")
         return True
     except Exception as e:
@@ -12,7 +12,6 @@ import json
 import argparse
 import subprocess
 import logging
-import time
 import traceback
 from pathlib import Path
 from datetime import datetime
@@ -63,104 +62,71 @@ def check_api_key():
     logger.info(f"OPENAI_API_KEY found (length: {len(api_key)})")
     return True
 
-def run_extract_ai_fields():
-    """Run the extract_ai_fields.py script"""
-    logger.info("Running extract_ai_fields.py...")
+def run_ai_pipeline():
+    """
+    Run extract_ai_fields.py and domain_enrichment.py as a single pipeline.
     
-    try:
-        script_path = SCRIPTS_DIR / "extract_ai_fields.py"
-        if not script_path.exists():
-            logger.error(f"Script does not exist: {script_path}")
-            return False
-        
-        cmd = [sys.executable, str(script_path), "--output", str(OUTPUT_DIR)]
-        logger.info(f"Running command: {' '.join(cmd)}")
-        
-        # Use subprocess.run to capture all output
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Print all output
-        if result.stdout:
-            logger.info(f"STDOUT:\n{result.stdout}")
-        if result.stderr:
-            logger.info(f"STDERR:\n{result.stderr}")
-        
-        # Verify that AI.json was created
-        ai_json_path = OUTPUT_DIR / "AI.json"
-        if not ai_json_path.exists():
-            logger.error(f"Failed to create {ai_json_path}")
-            return False
-        
-        try:
-            with open(ai_json_path, 'r') as f:
-                data = json.load(f)
-                entity_count = len(data.get('entities', []))
-                logger.info(f"AI.json created with {entity_count} entities")
-        except Exception as e:
-            logger.error(f"Error reading AI.json: {e}")
-            return False
-        
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"extract_ai_fields.py failed with exit code {e.returncode}")
-        if e.stdout:
-            logger.info(f"STDOUT:\n{e.stdout}")
-        if e.stderr:
-            logger.error(f"STDERR:\n{e.stderr}")
-        return False
-    except Exception as e:
-        logger.error(f"Error running extract_ai_fields.py: {e}")
-        logger.error(traceback.format_exc())
-        return False
-
-def run_domain_enrichment():
-    """Run the domain_enrichment.py script"""
-    logger.info("Running domain_enrichment.py...")
+    Extracted entities are streamed as NDJSON from the extract script's stdout
+    straight into the enrichment script's stdin, so the intermediate entity list
+    is never written to AI.json and read back.
+    """
+    logger.info("Running extract_ai_fields.py | domain_enrichment.py...")
     
     try:
-        script_path = SCRIPTS_DIR / "domain_enrichment.py"
-        if not script_path.exists():
-            logger.error(f"Script does not exist: {script_path}")
-            return False
+        extract_path = SCRIPTS_DIR / "extract_ai_fields.py"
+        enrich_path = SCRIPTS_DIR / "domain_enrichment.py"
+        for script_path in (extract_path, enrich_path):
+            if not script_path.exists():
+                logger.error(f"Script does not exist: {script_path}")
+                return False
         
         # Ensure API key is available
         if not check_api_key():
             logger.error("OpenAI API key not available. Cannot continue.")
             return False
         
-        # Run the script with --yes flag for automatic confirmation
-        cmd = [sys.executable, str(script_path), "--yes", "--output", str(OUTPUT_DIR)]
-        logger.info(f"Running command: {' '.join(cmd)}")
+        extract_cmd = [sys.executable, str(extract_path), "--ndjson"]
+        # Run the enrichment script with --yes flag for automatic confirmation
+        enrich_cmd = [sys.executable, str(enrich_path), "--yes", "--stdin", "--output", str(OUTPUT_DIR)]
+        logger.info(f"Running pipeline: {' '.join(extract_cmd)} | {' '.join(enrich_cmd)}")
         
         # Stream output in real-time
-        logger.info("Starting domain_enrichment.py process (this may take a while)...")
+        logger.info("Starting AI pipeline (this may take a while)...")
         
-        process = subprocess.Popen(
-            cmd,
+        # The extract script logs to stderr, which is inherited so it shows up directly
+        extract_process = subprocess.Popen(
+            extract_cmd,
+            stdout=subprocess.PIPE
+        )
+        enrich_process = subprocess.Popen(
+            enrich_cmd,
+            stdin=extract_process.stdout,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
             bufsize=1  # Line buffered
         )
+        # Only the enrichment process should hold the read end of the pipe
+        extract_process.stdout.close()
         
         # Print output as it comes in
-        for line in process.stdout:
+        for line in enrich_process.stdout:
             print(line.strip())  # Print directly to ensure visibility
             logger.info(f"DOMAIN_ENRICHMENT: {line.strip()}")
         
-        # Wait for process to finish
-        return_code = process.wait()
+        # Wait for both processes to finish
+        enrich_return_code = enrich_process.wait()
+        extract_return_code = extract_process.wait()
+        
+        if extract_return_code != 0:
+            logger.error(f"extract_ai_fields.py failed with exit code {extract_return_code}")
+            return False
         
         # Check if there was an error
-        if return_code != 0:
+        if enrich_return_code != 0:
             # Read error output
-            stderr = process.stderr.read()
-            logger.error(f"domain_enrichment.py failed with exit code {return_code}")
+            stderr = enrich_process.stderr.read()
+            logger.error(f"domain_enrichment.py failed with exit code {enrich_return_code}")
             logger.error(f"STDERR:\n{stderr}")
             return False
         
@@ -179,10 +145,10 @@ def run_domain_enrichment():
             logger.error(f"Error reading processed_AI.json: {e}")
             return False
         
-        logger.info("domain_enrichment.py completed successfully")
+        logger.info("AI pipeline completed successfully")
         return True
     except Exception as e:
-        logger.error(f"Error running domain_enrichment.py: {e}")
+        logger.error(f"Error running AI pipeline: {e}")
         logger.error(traceback.format_exc())
         return False
 
@@ -194,18 +160,9 @@ def main():
     if not check_api_key():
         logger.warning("OpenAI API key not available. Processing may fail.")
     
-    # Run the extract script
-    if not run_extract_ai_fields():
-        logger.error("Extract script failed. Aborting.")
-        return False
-    
-    # Wait a moment to ensure files are written
-    logger.info("Waiting 2 seconds before continuing...")
-    time.sleep(2)
-    
-    # Run the enrichment script
-    if not run_domain_enrichment():
-        logger.error("Enrichment script failed")
+    # Run the extract and enrichment scripts as one streaming pipeline
+    if not run_ai_pipeline():
+        logger.error("AI pipeline failed")
         return False
     
     logger.info("====== AI PROCESSING WORKFLOW COMPLETED ======")
@@ -1,18 +1,123 @@
 # scraper/base_parser.py
 from abc import ABC, abstractmethod
 import datetime
-import json
 import os
 import importlib
+import logging
 import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import orjson
 from utils.logging_utils import logger
-from utils.file_utils import load_json, save_json
+from tracker.utils.file_utils import load_json, save_json
 from browser.tor_browser import get_working_mirror, save_html_snapshot
+from tracker.scraper.snapshot_sink import SnapshotSink, dumps_with_group
+
+# Import the telegram notifier once instead of once per new entity
+try:
+    from tracker.telegram_bot.notifier import queue_entity_notification
+    _TELEGRAM_ENABLED = True
+except ImportError:
+    queue_entity_notification = None
+    _TELEGRAM_ENABLED = False
 
 # Define the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
 
+# Central new entities files in the output directory:
+# - new_entities.json is the view read by main.py and the processing scripts
+# - new_entities.jsonl is an append-only log written by the parsers during a run
+# - new_entities_ids.txt lists the keys of every entity in the view or the log
+NEW_ENTITIES_FILE = "new_entities.json"
+NEW_ENTITIES_LOG = "new_entities.jsonl"
+NEW_ENTITY_IDS_FILE = "new_entities_ids.txt"
+
+# Worker threads for file writes that can overlap with parsing
+_io_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="parser-io")
+
+# Keys from new_entities_ids.txt, loaded once per process and keyed by file path
+_new_entity_keys = {}
+
+# Serializes appends to the central log and id files when sites are scraped in parallel
+_new_entities_lock = threading.Lock()
+
+def _new_entity_key(entity):
+    """Deduplication key for the central new entities files"""
+    return f"{entity.get('group_key')}\t{entity.get('id')}"
+
+def _load_new_entity_keys(ids_path):
+    """Return the set of known new entity keys, reading the sidecar file only once"""
+    keys = _new_entity_keys.get(ids_path)
+    if keys is None:
+        keys = set()
+        if os.path.exists(ids_path):
+            with open(ids_path, 'r') as f:
+                keys.update(line.rstrip('\n') for line in f if line.strip())
+        _new_entity_keys[ids_path] = keys
+    return keys
+
+def compact_new_entities(output_dir):
+    """
+    Fold the append-only new entities log into the central new_entities.json view.
+    
+    Parsers only append to the log, so the view is rewritten once per scrape run
+    instead of once per group. The log is removed afterwards and the id sidecar is
+    rewritten to match the view.
+    
+    Args:
+        output_dir: Directory containing the central new entities files
+    
+    Returns:
+        Number of entities added to new_entities.json
+    """
+    log_path = os.path.join(output_dir, NEW_ENTITIES_LOG)
+    ids_path = os.path.join(output_dir, NEW_ENTITY_IDS_FILE)
+    central_path = os.path.join(output_dir, NEW_ENTITIES_FILE)
+    
+    if not os.path.exists(log_path):
+        return 0
+    
+    try:
+        with open(log_path, 'rb') as f:
+            logged_entities = [orjson.loads(line) for line in f if line.strip()]
+        
+        # Load existing central file or create a new one
+        if os.path.exists(central_path):
+            with open(central_path, 'rb') as f:
+                central_db = orjson.loads(f.read())
+        else:
+            central_db = {'entities': []}
+        
+        keys = {_new_entity_key(entity) for entity in central_db.get('entities', ())}
+        
+        # Append logged entities, avoiding duplicates
+        added = 0
+        for entity in logged_entities:
+            key = _new_entity_key(entity)
+            if key not in keys:
+                central_db['entities'].append(entity)
+                keys.add(key)
+                added += 1
+        
+        # Update metadata
+        central_db['last_updated'] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        central_db['total_count'] = len(central_db['entities'])
+        
+        # The central file stays indented since it is also read by humans
+        if not save_json(central_db, NEW_ENTITIES_FILE, output_dir, indent=True, sync=True):
+            return 0
+        with open(ids_path, 'w') as f:
+            f.writelines(f"{key}\n" for key in sorted(keys))
+        os.remove(log_path)
+        
+        _new_entity_keys[ids_path] = keys
+        logger.info(f"Compacted {added} new entities into central {NEW_ENTITIES_FILE}")
+        return added
+    except Exception as e:
+        logger.error(f"Error compacting new entities log: {e}")
+        return 0
+
 class BaseParser(ABC):
     """Base class for all site parsers"""
     
@@ -35,7 +140,10 @@ class BaseParser(ABC):
         self.output_dir = output_dir  # For shared files
         self.per_group_dir = per_group_dir  # For group-specific files
         self.html_snapshots_dir = html_snapshots_dir
-        self.new_entities_file = "new_entities.json"
+        self.new_entities_file = NEW_ENTITIES_FILE
+        # Time of the current scrape, set once per run by scrape_site()
+        self._scrape_now = None
+        self._scrape_now_str = None
     
     def scrape_site(self):
         """Connect to the site, save HTML snapshot, and extract entities"""
@@ -45,13 +153,19 @@ class BaseParser(ABC):
             logger.error(f"Failed to connect to any {self.site_name} mirror")
             return None
         
-        # Save HTML snapshot for analysis
-        html_file = save_html_snapshot(html_content, self.site_key, self.html_snapshots_dir)
-        logger.info(f"Saved HTML snapshot to {html_file}")
+        # Save HTML snapshot for analysis on a worker thread while the content is parsed
+        snapshot_future = _io_executor.submit(save_html_snapshot, html_content, self.site_key, self.html_snapshots_dir)
+        
+        # Timestamp shared by every entity parsed and saved during this scrape
+        self._scrape_now = datetime.datetime.now()
+        self._scrape_now_str = f"{self._scrape_now:%Y-%m-%d %H:%M:%S} UTC"
         
         # Parse entities from HTML content
         entities = self.parse_entities(html_content)
         
+        html_file = snapshot_future.result()
+        logger.info(f"Saved HTML snapshot to {html_file}")
+        
         # Update database if entities were found
         if entities:
             logger.info(f"Found {len(entities)} entities on {self.site_name}")
@@ -74,63 +188,66 @@ class BaseParser(ABC):
         """
         # Load existing entities to identify which ones are truly new
         existing_entities = load_json(self.json_file, self.per_group_dir)  # Use per_group_dir for group files
-        existing_dict = {entity.get('id'): entity for entity in existing_entities.get('entities', [])}
         
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        # Dictionary with all entities by ID, updated in place with the scraped entities
+        all_entities_dict = {entity.get('id'): entity for entity in existing_entities.get('entities', [])}
+        
+        current_time = self._scrape_now_str or f"{datetime.datetime.now():%Y-%m-%d %H:%M:%S} UTC"
         
         # List to track truly new entities for the new_entities.json file
         truly_new_entities = []
         
-        # Create a dictionary with all entities by ID for easier manipulation
-        all_entities_dict = existing_dict.copy()
+        # Check once per update whether Telegram notifications should be sent
+        notifications_disabled = os.environ.get('DISABLE_TELEGRAM') == 'true'
+        telegram_warned = False
         
-        # Process each newly scraped entity
+        # Check the log levels once instead of formatting messages per entity
+        log_info = logger.isEnabledFor(logging.INFO)
+        log_debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Process each newly scraped entity in a single pass
         for entity in new_entities:
             entity_id = entity.get('id')
             if not entity_id:
                 continue
-                
+            
             # Check if this is a truly new entity
-            if entity_id not in existing_dict:
+            existing_entity = all_entities_dict.get(entity_id)
+            if existing_entity is None:
                 # This is a new entity, set first_seen to current time
                 entity['first_seen'] = current_time
-                logger.info(f"New entity discovered: {entity.get('domain', entity_id)}")
+                if log_info:
+                    logger.info("New entity discovered: %s", entity.get('domain', entity_id))
                 
-                # Add to the list of truly new entities with group attribution
-                entity_copy = entity.copy()
-                entity_copy['ransomware_group'] = self.site_name
-                entity_copy['group_key'] = self.site_key
-                truly_new_entities.append(entity_copy)
+                # Add to the list of truly new entities (group attribution is added when they are written)
+                truly_new_entities.append(entity)
                 
                 # Send Telegram notification for new entity if not disabled
-                if os.environ.get('DISABLE_TELEGRAM') != 'true':
-                    try:
-                        # Try to import the telegram notifier module
-                        from tracker.telegram_bot.notifier import notify_new_entity
-                        
-                        # Send the notification
-                        notify_new_entity(entity_copy, self.site_name)
-                        logger.info(f"Telegram notification sent for {entity.get('domain', entity_id)}")
-                    except ImportError:
-                        logger.warning("Could not import telegram notifier. Notifications will not be sent.")
-                        logger.warning("If you want notifications, ensure 'requests' is installed.")
-                        logger.warning("For local development, also install 'python-dotenv'.")
-                    except Exception as e:
-                        logger.error(f"Failed to send Telegram notification: {e}")
-                else:
-                    logger.debug(f"Telegram notification skipped for {entity.get('domain', entity_id)} (notifications disabled)")
+                if notifications_disabled:
+                    if log_debug:
+                        logger.debug("Telegram notification skipped for %s (notifications disabled)", entity.get('domain', entity_id))
+                elif _TELEGRAM_ENABLED:
+                    # Sent by the notifier's background thread, off the scraping path
+                    queue_entity_notification(entity, self.site_name)
+                    if log_info:
+                        logger.info("Telegram notification queued for %s", entity.get('domain', entity_id))
+                elif not telegram_warned:
+                    logger.warning("Could not import telegram notifier. Notifications will not be sent.")
+                    logger.warning("If you want notifications, ensure 'requests' is installed.")
+                    logger.warning("For local development, also install 'python-dotenv'.")
+                    telegram_warned = True
                 
                 # Add the new entity to our merged dictionary
                 all_entities_dict[entity_id] = entity
             else:
                 # This is an existing entity - update it while preserving first_seen date
                 updated_entity = entity.copy()
-                updated_entity['first_seen'] = existing_dict[entity_id].get('first_seen', current_time)
+                updated_entity['first_seen'] = existing_entity.get('first_seen', current_time)
                 
                 # Preserve any important metadata that might be missing in the new entity
                 for key in ['ransomware_group', 'group_key']:
-                    if key not in updated_entity and key in existing_dict[entity_id]:
-                        updated_entity[key] = existing_dict[entity_id][key]
+                    if key not in updated_entity and key in existing_entity:
+                        updated_entity[key] = existing_entity[key]
                 
                 # Update the entity in our merged dictionary
                 all_entities_dict[entity_id] = updated_entity
@@ -145,21 +262,25 @@ class BaseParser(ABC):
             'total_count': len(merged_entities)
         }
         
-        # Save the group-specific entity file to the per_group directory 
-        save_json(updated_db, self.json_file, self.per_group_dir)  # Use per_group_dir for group files
-        logger.info(f"Saved merged database with {len(merged_entities)} entities to {os.path.join(self.per_group_dir, self.json_file)}")
+        # Save the group-specific entity file to the per_group directory on a worker thread
+        save_future = _io_executor.submit(save_json, updated_db, self.json_file, self.per_group_dir, indent=False, sync=True)  # Use per_group_dir for group files
         
         # Update the new_entities.json file if we discovered truly new entities
         if truly_new_entities:
             self.update_new_entities_file(truly_new_entities)
+        
+        save_future.result()
+        logger.info(f"Saved merged database with {len(merged_entities)} entities to {os.path.join(self.per_group_dir, self.json_file)}")
             
         return updated_db, len(truly_new_entities), len(merged_entities)
     
     def update_new_entities_file(self, truly_new_entities):
         """
         Two-part approach for handling new entities:
-        1. Save newly discovered entities to a timestamped file in the new_entities_snapshot directory
-        2. Append these entities to the central new_entities.json file in the output directory
+        1. Buffer newly discovered entities in the shared SnapshotSink, which writes one
+           timestamped file to the new_entities_snapshot directory per scrape run
+        2. Append these entities to the central new entities log in the output directory,
+           which compact_new_entities() later folds into new_entities.json
         
         If no new entities are found, no action is taken.
         
@@ -171,67 +292,34 @@ class BaseParser(ABC):
             logger.info("No new entities found. No files will be created or updated.")
             return
         
-        # 1. Save to snapshot directory with timestamped filename
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        snapshot_dir = os.path.join(PROJECT_ROOT, "data", "snapshots", "new_entities_snapshot")
-        os.makedirs(snapshot_dir, exist_ok=True)
+        # 1. Buffer for the run's snapshot file (written by SnapshotSink.flush())
+        SnapshotSink.instance().add(truly_new_entities, self.site_name, self.site_key)
         
-        snapshot_filename = f"new_entities_{timestamp}.json"
-        snapshot_path = os.path.join(snapshot_dir, snapshot_filename)
-        
-        current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
-        snapshot_db = {
-            'entities': truly_new_entities,
-            'last_updated': current_time,
-            'total_count': len(truly_new_entities),
-            'ransomware_group': self.site_name,
-            'group_key': self.site_key
-        }
-        
-        # Save the snapshot file
-        try:
-            with open(snapshot_path, 'w') as f:
-                json.dump(snapshot_db, f, indent=4)
-            logger.info(f"Created snapshot file {snapshot_filename} with {len(truly_new_entities)} new entities")
-        except Exception as e:
-            logger.error(f"Error saving snapshot file: {e}")
-        
-        # 2. Update the central new_entities.json file by appending the new entities
-        # Important: Use self.output_dir (not per_group_dir) for the central file
-        central_file = self.new_entities_file
-        central_path = os.path.join(self.output_dir, central_file)  # Use main output_dir, not per_group
+        # 2. Append the new entities to the central log (O(new entities) instead of rewriting
+        # the whole central file). Important: Use self.output_dir (not per_group_dir)
+        log_path = os.path.join(self.output_dir, NEW_ENTITIES_LOG)
+        ids_path = os.path.join(self.output_dir, NEW_ENTITY_IDS_FILE)
         
         try:
-            # Load existing central file or create a new one
-            if os.path.exists(central_path):
-                with open(central_path, 'r') as f:
-                    central_db = json.load(f)
-                
-                # Get existing entities as a dictionary for deduplication
-                existing_ids = {entity.get('id'): True for entity in central_db.get('entities', [])}
+            # The group file may still be being saved, so do not rely on it creating the directory
+            os.makedirs(self.output_dir, exist_ok=True)
+            with _new_entities_lock:
+                known_keys = _load_new_entity_keys(ids_path)
                 
                 # Append new entities, avoiding duplicates
-                for entity in truly_new_entities:
-                    entity_id = entity.get('id')
-                    if entity_id and entity_id not in existing_ids:
-                        central_db['entities'].append(entity)
-                        existing_ids[entity_id] = True
+                appended_keys = []
+                with open(log_path, 'ab', buffering=1 << 16) as f:
+                    for entity in truly_new_entities:
+                        key = f"{self.site_key}\t{entity.get('id')}"
+                        if entity.get('id') and key not in known_keys:
+                            f.write(dumps_with_group(entity, self.site_name, self.site_key) + b'\n')
+                            known_keys.add(key)
+                            appended_keys.append(key)
                 
-                # Update metadata
-                central_db['last_updated'] = current_time
-                central_db['total_count'] = len(central_db['entities'])
-            else:
-                # Create new central file with the same content as the snapshot
-                central_db = {
-                    'entities': truly_new_entities,
-                    'last_updated': current_time,
-                    'total_count': len(truly_new_entities)
-                }
-            
-            # Save the updated central file to the MAIN output directory
-            with open(central_path, 'w') as f:
-                json.dump(central_db, f, indent=4)
-            
-            logger.info(f"Updated central {central_file} with {len(truly_new_entities)} new entities")
+                # Record the keys only once the entities are safely in the log
+                with open(ids_path, 'a') as f:
+                    f.writelines(f"{key}\n" for key in appended_keys)
+                
+            logger.info(f"Appended {len(appended_keys)} new entities to central {NEW_ENTITIES_LOG}")
         except Exception as e:
-            logger.error(f"Error updating central file: {e}")
\ No newline at end of file
+            logger.error(f"Error updating central file: {e}")
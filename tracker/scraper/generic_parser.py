@@ -1,10 +1,138 @@
 # tracker/scraper/generic_parser.py
 import re
+import collections
 import datetime
-from bs4 import BeautifulSoup
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import soupsieve as sv
+from bs4 import BeautifulSoup, SoupStrainer
 from tracker.scraper.base_parser import BaseParser
 from tracker.utils.logging_utils import logger
 
+# Patterns for the 'self[attr="value"]' pseudo-selector used in conditions
+_SELF_ATTR_NAME_RE = re.compile(r'self\[(.*?)=')
+_SELF_ATTR_VALUE_RE = re.compile(r'="(.*?)"\]')
+
+# Matches each "<number><unit>" part of a text countdown like "5D 21h 16m 8s"
+_COUNTDOWN_RE = re.compile(r'(\d+)([Dhms])')
+
+# Field configuration normalized once per parser, with defaults filled in and the regex compiled
+FieldSpec = collections.namedtuple(
+    'FieldSpec',
+    'name type selector attribute regex regex_group convert optional default condition conditions'
+)
+
+# Element condition of a text, conditional or complex field; self_attr is the parsed
+# (attr, value) of a 'self[attr="value"]' selector
+ConditionSpec = collections.namedtuple('ConditionSpec', 'selector exists value self_attr')
+
+def _condition_spec(condition):
+    """Normalize a condition configuration"""
+    selector = condition.get('selector')
+    self_attr = _parse_self_selector(selector) if selector and selector.startswith('self[') else None
+    return ConditionSpec(selector, condition.get('exists', True), condition.get('value'), self_attr)
+
+def _field_spec(field_config):
+    """Normalize a field configuration so extractors read attributes instead of dict defaults"""
+    regex = field_config.get('regex')
+    condition = field_config.get('condition')
+    return FieldSpec(
+        name=field_config['name'],
+        type=field_config['type'],
+        selector=field_config.get('selector'),
+        attribute=field_config.get('attribute'),
+        regex=re.compile(regex) if regex else None,
+        regex_group=field_config.get('regex_group', 0),
+        convert=field_config.get('convert'),
+        optional=field_config.get('optional', False),
+        default=field_config.get('default'),
+        condition=_condition_spec(condition) if condition else None,
+        conditions=tuple(_condition_spec(c) for c in field_config.get('conditions', []))
+    )
+
+def _parse_self_selector(selector):
+    """Split a 'self[attr="value"]' selector into (attr, value), or return None if it is malformed"""
+    attr_name = _SELF_ATTR_NAME_RE.search(selector)
+    attr_value = _SELF_ATTR_VALUE_RE.search(selector)
+    if attr_name and attr_value:
+        return attr_name.group(1), attr_value.group(1)
+    return None
+
+def _match_self_attribute(entity_block, self_attr):
+    """Return the entity block if its attribute contains the value of a parsed 'self[attr="value"]' selector"""
+    if not self_attr:
+        return None
+    attr, val = self_attr
+    return entity_block if val in entity_block.get(attr, '') else None
+
+# Selectors made of an optional tag name and a single class or id, e.g. 'a.post-block' or '#main'
+_SIMPLE_SELECTOR_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?(?:\.(-?[a-zA-Z_][\w-]*)|#(-?[a-zA-Z_][\w-]*))?$')
+
+def _simple_finder(selector):
+    """
+    Translate a simple CSS selector into find_all() arguments.
+    
+    Args:
+        selector: CSS selector from the site configuration
+    
+    Returns:
+        Keyword arguments for find()/find_all(), or None if the selector needs soupsieve
+    """
+    match = _SIMPLE_SELECTOR_RE.match(selector.strip()) if selector else None
+    if not match or not any(match.groups()):
+        return None
+    
+    tag, class_name, element_id = match.groups()
+    finder = {'name': tag.lower() if tag else None}
+    if class_name:
+        finder['class_'] = class_name
+    elif element_id:
+        finder['id'] = element_id
+    return finder
+
+def _block_strainer(finder):
+    """
+    Build a SoupStrainer that keeps only the elements matched by _simple_finder() arguments.
+    
+    Args:
+        finder: Keyword arguments returned by _simple_finder()
+    
+    Returns:
+        SoupStrainer for BeautifulSoup's parse_only argument
+    """
+    attrs = {}
+    if 'class_' in finder:
+        class_name = finder['class_']
+        # The strainer may see the raw class string, so match one class out of several
+        attrs['class'] = lambda value: value is not None and \
+            class_name in (value.split() if isinstance(value, str) else value)
+    elif 'id' in finder:
+        attrs['id'] = finder['id']
+    return SoupStrainer(finder['name'], attrs)
+
+def _compile_selector(selector):
+    """Compile a CSS selector with soupsieve, or return None so the error surfaces where it is used"""
+    try:
+        return sv.compile(selector)
+    except Exception:
+        return None
+
+# Elements no field reads, removed before the selectors run unless a site disables pruning
+_PRUNED_TAGS = ['script', 'style', 'noscript', 'head', 'svg', 'iframe']
+
+# Smallest number of entity blocks worth starting worker processes for
+_PARALLEL_MIN_BLOCKS = 100
+
+# Start worker processes fresh instead of forking the scraper: by the time it parses, its notifier,
+# I/O and site threads may hold locks (such as a logging handler's) that a forked child would never see released
+_PARSE_MP_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+# Parser of a worker process during a parallel parse, created by _init_parse_worker
+_worker_parser = None
+
 class GenericParser(BaseParser):
     """Generic parser that uses configuration to parse any site"""
     
@@ -17,6 +145,166 @@ class GenericParser(BaseParser):
         self.parsing_config = site_config.get('parsing', {})
         self.entity_selector = self.parsing_config.get('entity_selector')
         self.field_configs = self.parsing_config.get('fields', [])
+        # BeautifulSoup tree builder, e.g. 'html.parser' or 'xml' for sites that need them
+        self.bs_parser = self.parsing_config.get('bs_parser', 'lxml')
+        # Remove scripts, styles and other non-content elements before parsing the entities
+        self.prune = self.parsing_config.get('prune', True)
+        
+        # Every element selector used by the fields, resolved once per document in parse_entities
+        self._field_selectors = []
+        self._collect_field_selectors(self.field_configs)
+        
+        # Simple selectors are matched with find_all() instead of soupsieve
+        self._entity_finder = _simple_finder(self.entity_selector)
+        self._field_finders = {selector: _simple_finder(selector) for selector in self._field_selectors}
+        
+        # In streaming mode only the entity blocks are built into the tree, skipping the rest of the page
+        self._entity_strainer = None
+        if self.parsing_config.get('streaming', False):
+            if self._entity_finder:
+                self._entity_strainer = _block_strainer(self._entity_finder)
+            else:
+                logger.warning(f"Streaming mode needs a simple entity selector on {self.site_name}, "
+                               f"parsing the full page instead of '{self.entity_selector}'")
+        
+        # Other selectors are compiled once instead of being parsed by soupsieve on each use
+        self._entity_compiled = None if self._entity_finder or not self.entity_selector \
+            else _compile_selector(self.entity_selector)
+        self._field_compiled = {selector: _compile_selector(selector)
+                                for selector, finder in self._field_finders.items() if not finder}
+        
+        # Extractor of each field type; complex fields are built by _compile_fields
+        self._field_extractors = {
+            'text': self._extract_text_field,
+            'attribute': self._extract_attribute_field,
+            'conditional': self._extract_conditional_field,
+        }
+        # Complex sub-fields only support text and attribute fields
+        self._sub_field_extractors = {
+            'text': self._extract_text_field,
+            'attribute': self._extract_attribute_field,
+        }
+        
+        # Whether the extractors' debug messages for missing values are emitted, refreshed per page
+        self._log_debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # One extraction callable per field, so the field type is dispatched once per site
+        self._compiled_fields = self._compile_fields(self.field_configs, nested=False)
+    
+    def _compile_fields(self, field_configs, nested):
+        """
+        Build the extraction callables for a list of field configurations.
+        
+        Args:
+            field_configs: Field configurations (top-level fields or complex sub-fields)
+            nested: True for complex sub-fields, which only support text and attribute fields
+        
+        Returns:
+            List of callables taking (entity, entity_block, sel_cache)
+        """
+        extractors = self._sub_field_extractors if nested else self._field_extractors
+        
+        compiled = []
+        for field_config in field_configs:
+            field_name = field_config.get('name')
+            field_type = field_config.get('type')
+            
+            if not field_name or not field_type:
+                continue
+            
+            if field_type == 'complex' and not nested:
+                sub_fields = self._compile_fields(field_config.get('fields', []), nested=True)
+                extractor = functools.partial(self._extract_complex_field, sub_fields=sub_fields)
+            else:
+                extractor = extractors.get(field_type)
+                if extractor is None:
+                    continue
+            
+            compiled.append(self._make_field_extractor(extractor, _field_spec(field_config), nested))
+        
+        return compiled
+    
+    def _make_field_extractor(self, extractor, spec, nested):
+        """Bind a field spec to its extractor and log any extraction error for the field"""
+        field_name = spec.name
+        label = "sub-field" if nested else "field"
+        optional = spec.optional
+        
+        def extract(entity, entity_block, sel_cache):
+            try:
+                extractor(entity, entity_block, spec, sel_cache)
+            except Exception as e:
+                if optional:
+                    logger.debug("Error extracting optional %s '%s': %s", label, field_name, e)
+                else:
+                    logger.warning("Error extracting %s '%s': %s", label, field_name, e)
+        
+        return extract
+    
+    def _collect_field_selectors(self, field_configs):
+        """Add the selectors of the fields, their conditions and sub-fields to _field_selectors"""
+        for field_config in field_configs:
+            selector = field_config.get('selector')
+            # ':scope' refers to the entity block, so it cannot be resolved on the document
+            if selector and selector != 'self' and not selector.startswith('self[') \
+                    and ':scope' not in selector and selector not in self._field_selectors:
+                self._field_selectors.append(selector)
+            
+            # Walk nested configurations (conditions and complex sub-fields)
+            if field_config.get('conditions'):
+                self._collect_field_selectors(field_config['conditions'])
+            if field_config.get('condition'):
+                self._collect_field_selectors([field_config['condition']])
+            if field_config.get('fields'):
+                self._collect_field_selectors(field_config['fields'])
+    
+    def _build_selector_index(self, soup, entity_blocks):
+        """
+        Resolve every field selector once on the whole document.
+        
+        Each match is assigned to the entity blocks that contain it, keeping the first
+        match in document order, which is what select_one() on the block would return.
+        
+        Args:
+            soup: Parsed document
+            entity_blocks: Entity blocks found in the document
+        
+        Returns:
+            List with one selector cache per entity block
+        """
+        block_index = {id(block): i for i, block in enumerate(entity_blocks)}
+        index = [{} for _ in entity_blocks]
+        resolved = []
+        
+        for selector in self._field_selectors:
+            try:
+                finder = self._field_finders.get(selector)
+                compiled = self._field_compiled.get(selector)
+                if finder:
+                    matches = soup.find_all(**finder)
+                elif compiled:
+                    matches = compiled.select(soup)
+                else:
+                    matches = soup.select(selector)
+            except Exception as e:
+                # Leave it to the per-block lookup, which reports the error for the field
+                logger.debug(f"Could not resolve selector '{selector}' on the document: {e}")
+                continue
+            resolved.append(selector)
+            
+            for match in matches:
+                # Walk all ancestors so nested entity blocks also see the match
+                for parent in match.parents:
+                    i = block_index.get(id(parent))
+                    if i is not None and selector not in index[i]:
+                        index[i][selector] = match
+        
+        # Selectors without a match in a block are cached as None
+        for sel_cache in index:
+            for selector in resolved:
+                sel_cache.setdefault(selector, None)
+        
+        return index
     
     def parse_entities(self, html_content):
         """Parse the HTML content to extract entities based on configuration"""
@@ -24,319 +312,316 @@ class GenericParser(BaseParser):
             logger.error(f"No entity selector defined for {self.site_name}")
             return None
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        self._log_debug = logger.isEnabledFor(logging.DEBUG)
+        soup = BeautifulSoup(html_content, self.bs_parser, parse_only=self._entity_strainer)
+        
+        # Drop subtrees that never hold entity data, so every selector walks a smaller tree
+        if self.prune:
+            for tag in soup.find_all(_PRUNED_TAGS):
+                tag.decompose()
         
         # Find all entity blocks using the configured selector
-        entity_blocks = soup.select(self.entity_selector)
+        if self._entity_finder:
+            entity_blocks = soup.find_all(**self._entity_finder)
+        elif self._entity_compiled:
+            entity_blocks = self._entity_compiled.select(soup)
+        else:
+            entity_blocks = soup.select(self.entity_selector)
         
         if not entity_blocks:
             logger.warning(f"No entity blocks found on {self.site_name} using selector: {self.entity_selector}")
             return None
         
-        logger.info(f"Found {len(entity_blocks)} entity blocks on {self.site_name}")
+        logger.info("Found %d entity blocks on %s", len(entity_blocks), self.site_name)
+        
+        # Parse the blocks in worker processes if the site enables it and the page is large enough
+        parsed_entities = None
+        parallel_workers = self.parsing_config.get('parallel_workers', 0)
+        if parallel_workers and len(entity_blocks) >= _PARALLEL_MIN_BLOCKS:
+            parsed_entities = self._parse_entities_parallel(entity_blocks, parallel_workers)
+        
+        if parsed_entities is None:
+            # Resolve the field selectors once for the whole document instead of once per block
+            selector_index = self._build_selector_index(soup, entity_blocks)
+            
+            if self.parsing_config.get('parallel_entities', False) and len(entity_blocks) > 1:
+                # Blocks are independent and each has its own selector cache, so threads can share the parser
+                with ThreadPoolExecutor(max_workers=min(8, len(entity_blocks))) as executor:
+                    parsed_entities = list(executor.map(self._parse_entity, entity_blocks, selector_index))
+            else:
+                parsed_entities = (self._parse_entity(block, sel_cache)
+                                   for block, sel_cache in zip(entity_blocks, selector_index))
         
-        # Parse each entity block
+        # Keep the entities that have an ID
         entities = []
-        for block in entity_blocks:
-            entity = self._parse_entity(block)
+        for entity in parsed_entities:
             if entity and 'id' in entity:
                 entities.append(entity)
             else:
-                logger.warning(f"Skipping entity without ID on {self.site_name}")
+                logger.warning("Skipping entity without ID on %s", self.site_name)
         
         return entities
     
     
-    def _parse_entity(self, entity_block):
+    def _parse_entities_parallel(self, entity_blocks, workers):
+        """
+        Parse entity blocks in a pool of worker processes.
+        
+        Each block is serialized to HTML and re-parsed on its own by a worker, so
+        selectors are matched within the block only.
+        
+        Args:
+            entity_blocks: Entity blocks found in the document
+            workers: Number of worker processes
+        
+        Returns:
+            List of parsed entities in block order, or None if the pool failed
+        """
+        block_htmls = [str(block) for block in entity_blocks]
+        
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_PARSE_MP_CONTEXT,
+                                     initializer=_init_parse_worker,
+                                     initargs=(self.site_config, self._scrape_now)) as executor:
+                entities = list(executor.map(_parse_entity_from_html, block_htmls, chunksize=64))
+            logger.info(f"Parsed {len(block_htmls)} entity blocks on {self.site_name} with {workers} worker processes")
+            return entities
+        except Exception as e:
+            logger.warning(f"Parallel parsing failed on {self.site_name}, parsing sequentially: {e}")
+            return None
+    
+    def _parse_entity(self, entity_block, sel_cache=None):
         """Parse an entity block based on field configurations"""
         entity = {}
         
-        # Process each configured field
-        for field_config in self.field_configs:
-            field_name = field_config.get('name')
-            field_type = field_config.get('type')
-            
-            if not field_name or not field_type:
-                continue
-            
-            try:
-                # Different handling based on field type
-                if field_type == 'text':
-                    self._extract_text_field(entity, entity_block, field_config)
-                elif field_type == 'attribute':
-                    self._extract_attribute_field(entity, entity_block, field_config)
-                elif field_type == 'conditional':
-                    self._extract_conditional_field(entity, entity_block, field_config)
-                elif field_type == 'complex':
-                    self._extract_complex_field(entity, entity_block, field_config)
-            except Exception as e:
-                is_optional = field_config.get('optional', False)
-                if is_optional:
-                    logger.debug(f"Error extracting optional field '{field_name}': {e}")
-                else:
-                    logger.warning(f"Error extracting field '{field_name}': {e}")
-        
-        # Add timestamp for countdown entities (for sites like LockBit)
-        if 'status' in entity and entity['status'] == 'countdown' and 'countdown_remaining' in entity:
-            countdown = entity['countdown_remaining']
-            if all(key in countdown for key in ['days', 'hours', 'minutes', 'seconds']):
-                try:
-                    current_time = datetime.datetime.now()
-                    delta = datetime.timedelta(
-                        days=countdown.get('days', 0),
-                        hours=countdown.get('hours', 0),
-                        minutes=countdown.get('minutes', 0),
-                        seconds=countdown.get('seconds', 0)
-                    )
-                    end_time = current_time + delta
-                    entity['estimated_publish_date'] = end_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-                except Exception as e:
-                    logger.warning(f"Error calculating estimated publish date: {e}")
+        # Selector results for this block, shared by all fields that use the same selector
+        if sel_cache is None:
+            sel_cache = {}
         
-        # Special handler for RansomHub's countdown format (e.g., "5D 21h 16m 8s")
-        if 'status' in entity and entity['status'] == 'countdown' and 'countdown_remaining' in entity:
-            countdown = entity['countdown_remaining']
-            if 'countdown_text' in countdown:
-                try:
-                    countdown_text = countdown['countdown_text']
-                    
-                    # Extract days, hours, minutes, seconds using regex patterns
-                    days = 0
-                    hours = 0
-                    minutes = 0
-                    seconds = 0
-                    
-                    days_match = re.search(r'(\d+)D', countdown_text)
-                    if days_match:
-                        days = int(days_match.group(1))
-                        
-                    hours_match = re.search(r'(\d+)h', countdown_text)
-                    if hours_match:
-                        hours = int(hours_match.group(1))
-                        
-                    minutes_match = re.search(r'(\d+)m', countdown_text)
-                    if minutes_match:
-                        minutes = int(minutes_match.group(1))
-                        
-                    seconds_match = re.search(r'(\d+)s', countdown_text)
-                    if seconds_match:
-                        seconds = int(seconds_match.group(1))
-                    
-                    # Update countdown object with parsed values
-                    countdown['days'] = days
-                    countdown['hours'] = hours
-                    countdown['minutes'] = minutes
-                    countdown['seconds'] = seconds
-                    
-                    # Calculate the estimated publish date
-                    current_time = datetime.datetime.now()
-                    delta = datetime.timedelta(
-                        days=days,
-                        hours=hours,
-                        minutes=minutes,
-                        seconds=seconds
-                    )
-                    end_time = current_time + delta
-                    entity['estimated_publish_date'] = end_time.strftime("%Y-%m-%d %H:%M:%S UTC")
-                    
-                    logger.info(f"Parsed RansomHub countdown: {countdown_text} → {entity['estimated_publish_date']}")
-                except Exception as e:
-                    logger.warning(f"Error parsing RansomHub countdown format: {e}")
+        # Process each configured field with its precompiled extractor
+        for extract in self._compiled_fields:
+            extract(entity, entity_block, sel_cache)
+        
+        # Add the estimated publish date for countdown entities
+        self._compute_publish_date(entity)
+        
+        return entity
+    
+    def _compute_publish_date(self, entity):
+        """
+        Set estimated_publish_date for a countdown entity.
+        
+        An exact countdown date takes precedence, then a countdown text like RansomHub's,
+        then separate days/hours/minutes/seconds values (for sites like LockBit).
+        
+        Args:
+            entity: Entity dictionary, updated in place
+        """
+        if entity.get('status') != 'countdown':
+            return
         
         # For sites that provide an exact countdown date (like some other sites might)
-        if 'status' in entity and entity['status'] == 'countdown' and 'countdown_date' in entity:
+        if 'countdown_date' in entity:
             try:
-                countdown_date = entity['countdown_date']
                 # Parse the date string (assuming YYYY-MM-DD HH:MM:SS format)
-                date_obj = datetime.datetime.strptime(countdown_date, "%Y-%m-%d %H:%M:%S")
+                date_obj = datetime.datetime.strptime(entity['countdown_date'], "%Y-%m-%d %H:%M:%S")
                 # Format with UTC suffix
-                entity['estimated_publish_date'] = date_obj.strftime("%Y-%m-%d %H:%M:%S UTC")
+                entity['estimated_publish_date'] = date_obj.isoformat(' ', 'seconds') + " UTC"
+                return
             except Exception as e:
                 logger.warning(f"Error parsing countdown date: {e}")
         
-        return entity
+        countdown = entity.get('countdown_remaining')
+        if not countdown:
+            return
+        
+        # Special handler for RansomHub's countdown format (e.g., "5D 21h 16m 8s")
+        if 'countdown_text' in countdown:
+            try:
+                countdown_text = countdown['countdown_text']
+                
+                # Extract days, hours, minutes, seconds in a single regex pass,
+                # keeping the first value found for each unit
+                units = {}
+                for value, unit in _COUNTDOWN_RE.findall(countdown_text):
+                    units.setdefault(unit, int(value))
+                
+                # Update countdown object with parsed values
+                countdown['days'] = units.get('D', 0)
+                countdown['hours'] = units.get('h', 0)
+                countdown['minutes'] = units.get('m', 0)
+                countdown['seconds'] = units.get('s', 0)
+                
+                entity['estimated_publish_date'] = self._countdown_end_time(countdown)
+                logger.info("Parsed RansomHub countdown: %s → %s", countdown_text, entity['estimated_publish_date'])
+                return
+            except Exception as e:
+                logger.warning(f"Error parsing RansomHub countdown format: {e}")
+        
+        if all(key in countdown for key in ['days', 'hours', 'minutes', 'seconds']):
+            try:
+                entity['estimated_publish_date'] = self._countdown_end_time(countdown)
+            except Exception as e:
+                logger.warning(f"Error calculating estimated publish date: {e}")
     
-    def _extract_text_field(self, entity, entity_block, field_config):
-        """Extract a text field from the entity block"""
-        field_name = field_config['name']
-        selector = field_config['selector']
-        regex = field_config.get('regex')
-        regex_group = field_config.get('regex_group', 0)
-        convert = field_config.get('convert')
+    def _countdown_end_time(self, countdown):
+        """Return the formatted end time of a countdown relative to the scrape time"""
+        current_time = self._scrape_now or datetime.datetime.now()
+        delta = datetime.timedelta(
+            days=countdown.get('days', 0),
+            hours=countdown.get('hours', 0),
+            minutes=countdown.get('minutes', 0),
+            seconds=countdown.get('seconds', 0)
+        )
+        end_time = current_time + delta
+        # Same output as strftime("%Y-%m-%d %H:%M:%S UTC") without parsing a format string
+        return end_time.isoformat(' ', 'seconds') + " UTC"
+    
+    def _select_one(self, entity_block, selector, sel_cache):
+        """Return the first element matching the selector within the block, memoized per entity"""
+        # Handle 'self' selector specially
+        if selector == 'self':
+            return entity_block
+        
+        if selector in sel_cache:
+            return sel_cache[selector]
         
+        finder = self._field_finders.get(selector)
+        compiled = self._field_compiled.get(selector)
+        if finder:
+            element = entity_block.find(**finder)
+        elif compiled:
+            element = compiled.select_one(entity_block)
+        else:
+            element = entity_block.select_one(selector)
+        sel_cache[selector] = element
+        return element
+    
+    def _extract_text_field(self, entity, entity_block, spec, sel_cache):
+        """Extract a text field from the entity block"""
         # Check for condition if present
-        condition = field_config.get('condition')
+        condition = spec.condition
         if condition:
-            cond_selector = condition.get('selector')
-            cond_exists = condition.get('exists', True)
-            
-            # Handle 'self' selector for condition
-            if cond_selector == 'self':
-                element = entity_block
-            else:
-                element = entity_block.select_one(cond_selector)
+            element = self._select_one(entity_block, condition.selector, sel_cache)
             
             # Skip if condition not met
-            if (cond_exists and not element) or (not cond_exists and element):
+            if (condition.exists and not element) or (not condition.exists and element):
                 return
         
-        # Handle 'self' selector specially
-        if selector == 'self':
-            element = entity_block
-        else:
-            element = entity_block.select_one(selector)
+        element = self._select_one(entity_block, spec.selector, sel_cache)
         
         if not element:
-            if not field_config.get('optional', False):
-                logger.debug(f"Could not find element with selector '{selector}' for field '{field_name}'")
+            if self._log_debug and not spec.optional:
+                logger.debug("Could not find element with selector '%s' for field '%s'", spec.selector, spec.name)
             return
         
         text = element.text.strip()
         
         # Apply regex if specified
+        regex = spec.regex
         if regex and text:
-            match = re.search(regex, text)
-            if match and regex_group <= len(match.groups()):
-                text = match.group(regex_group)
+            match = regex.search(text)
+            if match and spec.regex_group <= len(match.groups()):
+                text = match.group(spec.regex_group)
             else:
-                if not field_config.get('optional', False):
-                    logger.debug(f"Regex '{regex}' did not match for field '{field_name}'")
+                if self._log_debug and not spec.optional:
+                    logger.debug("Regex '%s' did not match for field '%s'", regex.pattern, spec.name)
                 return
         
         # Convert value if needed
-        if convert == 'int':
+        if spec.convert == 'int':
             try:
                 text = int(text)
             except ValueError:
-                if not field_config.get('optional', False):
-                    logger.debug(f"Could not convert value '{text}' to int for field '{field_name}'")
+                if self._log_debug and not spec.optional:
+                    logger.debug("Could not convert value '%s' to int for field '%s'", text, spec.name)
                 return
         
-        entity[field_name] = text
+        entity[spec.name] = text
     
-    def _extract_attribute_field(self, entity, entity_block, field_config):
+    def _extract_attribute_field(self, entity, entity_block, spec, sel_cache):
         """Extract an attribute field from the entity block"""
-        field_name = field_config['name']
-        selector = field_config['selector']
-        attribute = field_config['attribute']
-        regex = field_config.get('regex')
-        regex_group = field_config.get('regex_group', 0)
-        
-        # Handle 'self' selector specially
-        if selector == 'self':
-            element = entity_block
-        else:
-            element = entity_block.select_one(selector)
+        element = self._select_one(entity_block, spec.selector, sel_cache)
         
         if not element:
-            if not field_config.get('optional', False):
-                logger.debug(f"Could not find element with selector '{selector}' for field '{field_name}'")
+            if self._log_debug and not spec.optional:
+                logger.debug("Could not find element with selector '%s' for field '%s'", spec.selector, spec.name)
             return
         
-        value = element.get(attribute, '')
+        value = element.get(spec.attribute, '')
         
         # Apply regex if specified
+        regex = spec.regex
         if regex and value:
-            match = re.search(regex, value)
-            if match and regex_group <= len(match.groups()):
-                value = match.group(regex_group)
+            match = regex.search(value)
+            if match and spec.regex_group <= len(match.groups()):
+                value = match.group(spec.regex_group)
             else:
-                if not field_config.get('optional', False):
-                    logger.debug(f"Regex '{regex}' did not match for field '{field_name}'")
+                if self._log_debug and not spec.optional:
+                    logger.debug("Regex '%s' did not match for field '%s'", regex.pattern, spec.name)
                 return
         
-        entity[field_name] = value
+        entity[spec.name] = value
     
-    def _extract_conditional_field(self, entity, entity_block, field_config):
+    def _extract_conditional_field(self, entity, entity_block, spec, sel_cache):
         """Extract a conditional field based on element existence"""
-        field_name = field_config['name']
-        conditions = field_config.get('conditions', [])
-        default_value = field_config.get('default')
-        
-        for condition in conditions:
-            selector = condition['selector']
-            exists = condition.get('exists', True)
-            value = condition.get('value')
-            
+        for selector, exists, value, self_attr in spec.conditions:
             # Handle 'self' and special selectors
             if selector == 'self':
                 element = entity_block
             elif selector.startswith('self['):
                 # Handle self with attributes like 'self[class*="timer"]'
-                attr_name = re.search(r'self\[(.*?)=', selector)
-                attr_value = re.search(r'="(.*?)"\]', selector)
-                if attr_name and attr_value:
-                    attr = attr_name.group(1)
-                    val = attr_value.group(1)
-                    attr_value = entity_block.get(attr, '')
-                    element = entity_block if val in attr_value else None
-                else:
-                    element = None
+                element = _match_self_attribute(entity_block, self_attr)
             else:
-                element = entity_block.select_one(selector)
+                element = self._select_one(entity_block, selector, sel_cache)
             
             # Check if the element exists as expected
             if (exists and element) or (not exists and not element):
-                entity[field_name] = value
+                entity[spec.name] = value
                 return
         
         # Use default value if no condition matched
-        if default_value is not None:
-            entity[field_name] = default_value
+        if spec.default is not None:
+            entity[spec.name] = spec.default
     
-    def _extract_complex_field(self, entity, entity_block, field_config):
-        """Extract a complex field with sub-fields"""
-        field_name = field_config['name']
-        condition = field_config.get('condition', {})
-        sub_fields = field_config.get('fields', [])
-        
+    def _extract_complex_field(self, entity, entity_block, spec, sel_cache, sub_fields):
+        """Extract a complex field with sub-fields (compiled by _compile_fields)"""
         # Check condition first
+        condition = spec.condition
         if condition:
-            selector = condition.get('selector')
-            exists = condition.get('exists', True)
+            selector, exists, self_attr = condition.selector, condition.exists, condition.self_attr
             
             # Handle 'self' and special selectors
             if selector == 'self':
                 element = entity_block
             elif selector.startswith('self['):
                 # Handle self with attributes like 'self[class*="timer"]'
-                attr_name = re.search(r'self\[(.*?)=', selector)
-                attr_value = re.search(r'="(.*?)"\]', selector)
-                if attr_name and attr_value:
-                    attr = attr_name.group(1)
-                    val = attr_value.group(1)
-                    attr_value = entity_block.get(attr, '')
-                    element = entity_block if val in attr_value else None
-                else:
-                    element = None
+                element = _match_self_attribute(entity_block, self_attr)
             else:
-                element = entity_block.select_one(selector)
+                element = self._select_one(entity_block, selector, sel_cache)
             
             if (exists and not element) or (not exists and element):
                 return
         
         # Extract sub-fields into a nested object
         sub_entity = {}
-        for sub_field in sub_fields:
-            sub_field_name = sub_field.get('name')
-            sub_field_type = sub_field.get('type')
-            
-            if not sub_field_name or not sub_field_type:
-                continue
-            
-            try:
-                # Different handling based on field type
-                if sub_field_type == 'text':
-                    self._extract_text_field(sub_entity, entity_block, sub_field)
-                elif sub_field_type == 'attribute':
-                    self._extract_attribute_field(sub_entity, entity_block, sub_field)
-            except Exception as e:
-                is_optional = sub_field.get('optional', False)
-                if is_optional:
-                    logger.debug(f"Error extracting optional sub-field '{sub_field_name}': {e}")
-                else:
-                    logger.warning(f"Error extracting sub-field '{sub_field_name}': {e}")
+        for extract in sub_fields:
+            extract(sub_entity, entity_block, sel_cache)
         
         # Only add the complex field if at least one sub-field was extracted
         if sub_entity:
-            entity[field_name] = sub_entity
\ No newline at end of file
+            entity[spec.name] = sub_entity
+
+def _init_parse_worker(site_config, scrape_now):
+    """Create the parser used by a worker process for parallel parsing"""
+    global _worker_parser
+    _worker_parser = GenericParser(None, site_config, None, None, None)
+    _worker_parser._scrape_now = scrape_now
+
+def _parse_entity_from_html(block_html):
+    """Re-parse a serialized entity block in a worker process and extract its entity"""
+    fragment = BeautifulSoup(block_html, _worker_parser.bs_parser)
+    entity_block = fragment.body.find() if fragment.body else fragment.find()
+    if entity_block is None:
+        return None
+    return _worker_parser._parse_entity(entity_block)
@@ -0,0 +1,125 @@
+# tracker/scraper/snapshot_sink.py
+import datetime
+import os
+import threading
+from pathlib import Path
+import orjson
+from tracker.utils.logging_utils import logger
+
+# Define the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
+
+def dumps_with_group(entity, group_name, group_key):
+    """
+    Serialize an entity with its ransomware_group and group_key fields.
+    
+    The fields are set on a copy, so the scraped entity dict stays as it is stored
+    in the group file.
+    
+    Args:
+        entity: Entity dictionary
+        group_name: Display name of the ransomware group
+        group_key: Site key of the ransomware group
+    
+    Returns:
+        Serialized entity as bytes
+    """
+    return orjson.dumps({**entity, 'ransomware_group': group_name, 'group_key': group_key})
+
+class SnapshotSink:
+    """
+    Process-wide buffer for new entity snapshots.
+    
+    Parsers add their newly discovered entities during a scrape run and the driver
+    flushes the buffer once at the end, so a run produces a single timestamped
+    new_entities_<timestamp>.json file instead of one file per group.
+    """
+    
+    _instance = None
+    # Parsers of sites scraped in parallel may ask for the sink at the same time
+    _instance_lock = threading.Lock()
+    
+    def __init__(self, snapshot_dir=None):
+        """
+        Initialize the sink.
+        
+        Args:
+            snapshot_dir: Directory for snapshot files (defaults to data/snapshots/new_entities_snapshot)
+        """
+        self.snapshot_dir = snapshot_dir or os.path.join(PROJECT_ROOT, "data", "snapshots", "new_entities_snapshot")
+        self.batches = []
+        self.groups = []
+        # Parsers of sites scraped in parallel add from several threads
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def instance(cls):
+        """Return the shared sink, creating it on first use"""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+    
+    def add(self, entity_list, group_name, group_key):
+        """
+        Buffer newly discovered entities for the next snapshot.
+        
+        Args:
+            entity_list: List of entities that are truly new (not seen before)
+            group_name: Display name of the ransomware group
+            group_key: Site key of the ransomware group
+        """
+        if not entity_list:
+            return
+        
+        # Group fields are attached when the snapshot is serialized
+        with self._lock:
+            self.batches.append((entity_list, group_name, group_key))
+            self.groups.append({
+                'ransomware_group': group_name,
+                'group_key': group_key,
+                'total_count': len(entity_list)
+            })
+    
+    def flush(self):
+        """
+        Write all buffered entities to one timestamped snapshot file and clear the buffer.
+        
+        Returns:
+            Path of the snapshot file, or None if nothing was buffered or saving failed
+        """
+        if not self.batches:
+            logger.info("No new entities buffered. No snapshot file will be created.")
+            return None
+        
+        now = datetime.datetime.now()
+        snapshot_filename = f"new_entities_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        snapshot_path = os.path.join(self.snapshot_dir, snapshot_filename)
+        
+        total_count = sum(len(entity_list) for entity_list, _, _ in self.batches)
+        snapshot_meta = {
+            'last_updated': now.strftime("%Y-%m-%d %H:%M:%S UTC"),
+            'total_count': total_count,
+            'groups': self.groups
+        }
+        
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            # Snapshots are machine-read, so write them compact through a large buffer
+            with open(snapshot_path, 'wb', buffering=1 << 20) as f:
+                f.write(b'{"entities":[')
+                f.write(b','.join(dumps_with_group(entity, group_name, group_key)
+                                  for entity_list, group_name, group_key in self.batches
+                                  for entity in entity_list))
+                f.write(b'],')
+                f.write(orjson.dumps(snapshot_meta)[1:])
+            logger.info(f"Created snapshot file {snapshot_filename} with {total_count} new entities "
+                        f"from {len(self.groups)} groups")
+        except Exception as e:
+            logger.error(f"Error saving snapshot file: {e}")
+            return None
+        
+        self.batches = []
+        self.groups = []
+        return snapshot_path
@@ -1,7 +1,12 @@
 # tracker/telegram_bot/notifier.py
 import os
 import logging
+import atexit
+import queue
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 from datetime import datetime
 from pathlib import Path
@@ -18,6 +23,10 @@ LOGS_DIR = PROJECT_ROOT / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)
 NOTIFICATION_LOG = LOGS_DIR / 'telegram_notifications.log'
 
+# Notification log kept open for the whole run and flushed once per sent message
+_notification_log_file = None
+_notification_log_lock = threading.Lock()
+
 # Get Telegram credentials from environment
 # In GitHub Actions, these should be set as repository secrets
 if not IN_GITHUB_ACTIONS:
@@ -33,24 +42,69 @@ if not IN_GITHUB_ACTIONS:
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHANNEL_ID = os.environ.get('TELEGRAM_CHANNEL_ID')
 
-def log_notification(entity, message, success):
+# Queue of (entity, site_name) pairs sent by a background thread, so scraping
+# does not wait on one Telegram round-trip per new entity
+_notification_queue = queue.Queue()
+_notification_thread = None
+_notification_lock = threading.Lock()
+
+# Formatted entity notifications waiting to be sent together, as (entity, site_name, message)
+_pending_messages = []
+_pending_lock = threading.Lock()
+
+# Telegram accepts up to 4096 characters per message; stay below it for the separators
+BATCH_MESSAGE_LIMIT = 4000
+BATCH_SEPARATOR = "\n\n—\n\n"
+
+# One HTTP session for all messages, so the TLS connection is reused between posts.
+# Only failed connections and rate limits (429, honoring Retry-After) are retried with backoff:
+# after a read error or a server error Telegram may already have sent the message
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3,
+    connect=3,
+    read=0,
+    backoff_factor=1,
+    status_forcelist=(429,),
+    allowed_methods=frozenset(['POST'])
+)))
+
+# Seconds to wait for Telegram to accept the connection and to answer
+TELEGRAM_TIMEOUT = 10
+
+def log_notification(entity, message, success, group_name=None):
     """Log notification details to file for record-keeping."""
     try:
         log_entry = {
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'entity_id': entity.get('id'),
             'domain': entity.get('domain'),
-            'group': entity.get('ransomware_group', ''),
+            'group': group_name or entity.get('ransomware_group', ''),
             'message_length': len(message),
             'success': success
         }
         
-        with open(NOTIFICATION_LOG, 'a') as f:
-            f.write(json.dumps(log_entry) + '\n')
+        line = json.dumps(log_entry, separators=(',', ':')) + '\n'
+        
+        global _notification_log_file
+        with _notification_log_lock:
+            if _notification_log_file is None:
+                _notification_log_file = open(NOTIFICATION_LOG, 'a', buffering=1 << 16)
+                atexit.register(flush_notification_log)
+            _notification_log_file.write(line)
             
     except Exception as e:
         logger.error(f"Failed to log notification: {e}")
 
+def flush_notification_log():
+    """Write the buffered notification log entries to disk."""
+    try:
+        with _notification_log_lock:
+            if _notification_log_file is not None:
+                _notification_log_file.flush()
+    except Exception as e:
+        logger.error(f"Failed to flush notification log: {e}")
+
 def send_telegram_message(message):
     """Send a message to the Telegram channel."""
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHANNEL_ID:
@@ -69,7 +123,7 @@ def send_telegram_message(message):
             "parse_mode": "HTML"  # Enable HTML formatting
         }
         
-        response = requests.post(url, data=data)
+        response = _session.post(url, data=data, timeout=TELEGRAM_TIMEOUT)
         response.raise_for_status()  # Raise an exception for bad responses
         
         logger.info(f"Telegram message sent successfully: {response.status_code}")
@@ -81,78 +135,168 @@ def send_telegram_message(message):
 
 def format_entity_notification(entity, site_name):
     """Format entity data into a readable Telegram notification message."""
-    message = f"🚨 <b>New Ransomware Victim Discovered!</b>\n\n"
+    parts = ["🚨 <b>New Ransomware Victim Discovered!</b>\n\n"]
     
     # Core information
-    message += f"<b>Domain:</b> {entity.get('domain', 'Unknown')}\n"
-    message += f"<b>Ransomware Group:</b> {site_name}\n"
+    parts.append(f"<b>Domain:</b> {entity.get('domain', 'Unknown')}\n")
+    parts.append(f"<b>Ransomware Group:</b> {site_name}\n")
     
     # Entity status
-    if entity.get('status'):
-        status = entity.get('status').capitalize()
+    raw_status = entity.get('status')
+    if raw_status:
+        status = raw_status.capitalize()
         if status == "Countdown":
-            message += f"<b>Status:</b> ⏳ {status}\n"
+            parts.append(f"<b>Status:</b> ⏳ {status}\n")
         elif status == "Published":
-            message += f"<b>Status:</b> 📢 {status}\n"
+            parts.append(f"<b>Status:</b> 📢 {status}\n")
         else:
-            message += f"<b>Status:</b> {status}\n"
+            parts.append(f"<b>Status:</b> {status}\n")
     
     # Views/visits information
-    if entity.get('views'):
-        message += f"<b>Views:</b> {entity.get('views')}\n"
-    elif entity.get('visits'):
-        message += f"<b>Visits:</b> {entity.get('visits')}\n"
+    views = entity.get('views')
+    visits = entity.get('visits')
+    if views:
+        parts.append(f"<b>Views:</b> {views}\n")
+    elif visits:
+        parts.append(f"<b>Visits:</b> {visits}\n")
     
     # Data size if available (RansomHub specific)
-    if entity.get('data_size'):
-        message += f"<b>Data Size:</b> {entity.get('data_size')}\n"
+    data_size = entity.get('data_size')
+    if data_size:
+        parts.append(f"<b>Data Size:</b> {data_size}\n")
     
     # Country information
-    if entity.get('country'):
-        message += f"<b>Country:</b> {entity.get('country')}\n"
+    country = entity.get('country')
+    if country:
+        parts.append(f"<b>Country:</b> {country}\n")
         
     # Description preview
-    if entity.get('description_preview'):
+    description = entity.get('description_preview')
+    if description:
         # Truncate long descriptions
-        description = entity.get('description_preview').strip()
+        description = description.strip()
         if len(description) > 200:
             description = description[:197] + "..."
-        message += f"\n<b>Description:</b>\n{description}\n"
+        parts.append(f"\n<b>Description:</b>\n{description}\n")
     
     # Countdown information
-    if entity.get('status') == 'countdown' and entity.get('countdown_remaining'):
-        countdown = entity.get('countdown_remaining')
+    countdown = entity.get('countdown_remaining')
+    if raw_status == 'countdown' and countdown:
         if isinstance(countdown, dict):
             # Handle different countdown formats
             if all(key in countdown for key in ['days', 'hours', 'minutes', 'seconds']):
-                message += f"\n<b>Countdown:</b> {countdown.get('days', 0)}d {countdown.get('hours', 0)}h "
-                message += f"{countdown.get('minutes', 0)}m {countdown.get('seconds', 0)}s\n"
+                parts.append(f"\n<b>Countdown:</b> {countdown.get('days', 0)}d {countdown.get('hours', 0)}h "
+                             f"{countdown.get('minutes', 0)}m {countdown.get('seconds', 0)}s\n")
             elif 'countdown_text' in countdown:
-                message += f"\n<b>Countdown:</b> {countdown.get('countdown_text')}\n"
+                parts.append(f"\n<b>Countdown:</b> {countdown.get('countdown_text')}\n")
     
     # Publication date
-    if entity.get('estimated_publish_date'):
-        message += f"<b>Estimated Publication:</b> {entity.get('estimated_publish_date')}\n"
+    publish_date = entity.get('estimated_publish_date')
+    if publish_date:
+        parts.append(f"<b>Estimated Publication:</b> {publish_date}\n")
     
     # Add discovery timestamp
-    message += f"\n<i>First seen: {entity.get('first_seen', 'Unknown')}</i>"
+    parts.append(f"\n<i>First seen: {entity.get('first_seen', 'Unknown')}</i>")
     
-    return message
+    return "".join(parts)
 
 def notify_new_entity(entity, site_name):
-    """Send a Telegram notification for a newly discovered entity."""
+    """
+    Add a notification for a newly discovered entity to the pending batch.
+    
+    Pending notifications are sent together in as few messages as possible, as soon
+    as they fill one message or when flush_notifications() is called.
+    """
     try:
         message = format_entity_notification(entity, site_name)
-        success = send_telegram_message(message)
         
-        # Log the notification
-        log_notification(entity, message, success)
+        with _pending_lock:
+            _pending_messages.append((entity, site_name, message))
+            pending_length = sum(len(pending[2]) + len(BATCH_SEPARATOR) for pending in _pending_messages)
         
-        return success
+        # Send right away once a full message is ready
+        if pending_length >= BATCH_MESSAGE_LIMIT:
+            _send_pending_messages(full_only=True)
+        
+        return True
     except Exception as e:
         logger.error(f"Error in notify_new_entity: {e}")
         return False
 
+def _send_pending_messages(full_only=False):
+    """
+    Send the pending entity notifications, joined into messages of up to BATCH_MESSAGE_LIMIT characters.
+    
+    Args:
+        full_only: Keep the last, partly filled message pending so it can still grow
+    """
+    global _pending_messages
+    
+    with _pending_lock:
+        pending, _pending_messages = _pending_messages, []
+    
+    # Group consecutive notifications into batches that fit in one message
+    batches = []
+    batch_length = 0
+    for item in pending:
+        message_length = len(item[2])
+        if batches and batch_length + len(BATCH_SEPARATOR) + message_length <= BATCH_MESSAGE_LIMIT:
+            batches[-1].append(item)
+            batch_length += len(BATCH_SEPARATOR) + message_length
+        else:
+            batches.append([item])
+            batch_length = message_length
+    
+    if full_only and batches:
+        with _pending_lock:
+            _pending_messages = batches.pop() + _pending_messages
+    
+    for batch in batches:
+        message = BATCH_SEPARATOR.join(item[2] for item in batch)
+        success = send_telegram_message(message)
+        
+        # Log the notification of each entity in the batch
+        for entity, site_name, entity_message in batch:
+            log_notification(entity, entity_message, success, site_name)
+        flush_notification_log()
+
+def _notification_worker():
+    """Send queued entity notifications until the process exits."""
+    while True:
+        entity, site_name = _notification_queue.get()
+        try:
+            notify_new_entity(entity, site_name)
+        finally:
+            _notification_queue.task_done()
+
+def queue_entity_notification(entity, site_name):
+    """
+    Queue a Telegram notification for a newly discovered entity.
+    
+    The notification is sent by a background thread that is started on first use.
+    Call flush_notifications() to wait until everything queued has been sent.
+    
+    Args:
+        entity: Entity dictionary of the new entity
+        site_name: Display name of the ransomware group
+    """
+    global _notification_thread
+    
+    with _notification_lock:
+        if _notification_thread is None:
+            _notification_thread = threading.Thread(target=_notification_worker, name="telegram-notifier", daemon=True)
+            _notification_thread.start()
+            # Make sure pending notifications are not lost when the process exits
+            atexit.register(flush_notifications)
+    
+    _notification_queue.put((entity, site_name))
+
+def flush_notifications():
+    """Block until all queued entity notifications have been sent."""
+    if _notification_thread is not None:
+        _notification_queue.join()
+    _send_pending_messages()
+
 def send_scan_completion_notification(sites_processed, total_entities, new_entities):
     """
     Send a notification when a scan completes, even if no new entities were found.
@@ -163,33 +307,32 @@ def send_scan_completion_notification(sites_processed, total_entities, new_entit
         new_entities: Number of new entities discovered in this scan
     """
     try:
+        # Send the pending entity notifications before the summary
+        flush_notifications()
+        
         # Format the message with scan results
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
         
         # Create a message with scan summary
-        message = f"🔍 <b>Ransomware Tracker Scan Completed</b>\n\n"
-        message += f"<b>Time:</b> {timestamp}\n"
+        parts = ["🔍 <b>Ransomware Tracker Scan Completed</b>\n\n", f"<b>Time:</b> {timestamp}\n"]
         
         # Add sites processed
         if sites_processed:
-            message += f"\n<b>Sites Scanned:</b>\n"
-            for site in sites_processed:
-                message += f"• {site}\n"
+            parts.append("\n<b>Sites Scanned:</b>\n")
+            parts.extend(f"• {site}\n" for site in sites_processed)
         
         # Add statistics
-        message += f"\n<b>Total Entities:</b> {total_entities}\n"
+        parts.append(f"\n<b>Total Entities:</b> {total_entities}\n")
         
-        # Highlight new entities with emoji based on count
+        # Highlight new entities with emoji based on count, and add a status indicator
         if new_entities > 0:
-            message += f"<b>New Entities:</b> 🚨 {new_entities} 🚨\n"
+            parts.append(f"<b>New Entities:</b> 🚨 {new_entities} 🚨\n")
+            parts.append("\n✅ <i>New entities were discovered and notifications sent</i>")
         else:
-            message += f"<b>New Entities:</b> 0 (No new entities found)\n"
+            parts.append("<b>New Entities:</b> 0 (No new entities found)\n")
+            parts.append("\n✅ <i>Scan completed successfully with no new entities</i>")
         
-        # Add a status indicator
-        if new_entities > 0:
-            message += f"\n✅ <i>New entities were discovered and notifications sent</i>"
-        else:
-            message += f"\n✅ <i>Scan completed successfully with no new entities</i>"
+        message = "".join(parts)
         
         # Send the message
         success = send_telegram_message(message)
@@ -202,6 +345,7 @@ def send_scan_completion_notification(sites_processed, total_entities, new_entit
         # Create a dummy entity for logging purposes
         dummy_entity = {'id': 'scan_summary', 'domain': 'scan_summary'}
         log_notification(dummy_entity, message, success)
+        flush_notification_log()
         
         return success
     except Exception as e:
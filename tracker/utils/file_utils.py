@@ -1,22 +1,88 @@
-# utils/file_utils.py
+# tracker/utils/file_utils.py
 import json
 import os
 import logging
+import threading
+from collections import OrderedDict
+import orjson
 
 # Create a logger for this module
 logger = logging.getLogger(__name__)
 
+# Set JSON_COMPACT=true to save JSON without indentation (smaller and faster to write)
+JSON_COMPACT = os.environ.get('JSON_COMPACT', '').lower() in ('1', 'true', 'yes')
+
+# Most files kept decoded in memory; the least recently loaded ones are dropped first
+JSON_CACHE_SIZE = 64
+
+# Decoded JSON files by path, with the (mtime, size) they were read at, in least recently used order
+_json_cache = OrderedDict()
+_json_cache_lock = threading.Lock()
+
+def _cache_get(filepath, file_version):
+    """Return the cached data of a file if it was decoded at this (mtime, size), else None."""
+    with _json_cache_lock:
+        cached = _json_cache.get(filepath)
+        if cached is None or cached[0] != file_version:
+            return None
+        _json_cache.move_to_end(filepath)
+        return cached[1]
+
+def _cache_put(filepath, file_version, data):
+    """Cache the decoded data of a file, dropping the least recently used file when full."""
+    with _json_cache_lock:
+        _json_cache[filepath] = (file_version, data)
+        _json_cache.move_to_end(filepath)
+        if len(_json_cache) > JSON_CACHE_SIZE:
+            _json_cache.popitem(last=False)
+
+def _cache_discard(filepath):
+    """Drop a file from the cache before it is rewritten."""
+    with _json_cache_lock:
+        _json_cache.pop(filepath, None)
+
+# Directories already created or found to exist by this process
+_ENSURED_DIRS = set()
+
+def _ensure_dir(directory):
+    """Create a directory unless this process already made sure it exists."""
+    if directory not in _ENSURED_DIRS:
+        os.makedirs(directory, exist_ok=True)
+        _ENSURED_DIRS.add(directory)
+
+def read_json(filepath):
+    """
+    Read a JSON file in one read and decode it with orjson.
+    
+    Nothing is cached and errors are left to the caller: a missing file raises
+    FileNotFoundError and invalid JSON raises orjson.JSONDecodeError, which subclasses
+    json.JSONDecodeError.
+    """
+    with open(filepath, 'rb') as f:
+        return orjson.loads(f.read())
+
 def load_json(filename, output_dir):
     """
     Load JSON data from a file, checking both the specified directory and the parent directory
     for backward compatibility.
+    
+    The last JSON_CACHE_SIZE files are cached in memory and only decoded again when their
+    modification time or size changes, so the returned data is shared between callers and
+    must not be modified.
     """
     filepath = os.path.join(output_dir, filename)
     
     # First try the specified path
     try:
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        stat = os.stat(filepath)
+        file_version = (stat.st_mtime_ns, stat.st_size)
+        cached = _cache_get(filepath, file_version)
+        if cached is not None:
+            return cached
+        
+        data = read_json(filepath)
+        _cache_put(filepath, file_version, data)
+        return data
     except FileNotFoundError:
         # If file not found, check if output_dir ends with "per_group"
         if os.path.basename(output_dir) == "per_group":
@@ -24,12 +90,14 @@ def load_json(filename, output_dir):
             parent_dir = os.path.dirname(output_dir)
             parent_filepath = os.path.join(parent_dir, filename)
             try:
-                with open(parent_filepath, 'r') as f:
-                    data = json.load(f)
-                    logger.info(f"Found file in parent directory: {parent_filepath}")
-                    # Save to the new location for future use
-                    save_json(data, filename, output_dir)
-                    return data
+                data = read_json(parent_filepath)
+                logger.info(f"Found file in parent directory: {parent_filepath}")
+                # Save to the new location for future use, unless another parser already migrated it
+                if not os.path.isfile(filepath) and save_json(data, filename, output_dir):
+                    # The migrated data is what was just written, so later loads don't read it back
+                    stat = os.stat(filepath)
+                    _cache_put(filepath, (stat.st_mtime_ns, stat.st_size), data)
+                return data
             except FileNotFoundError:
                 logger.info(f"File not found in either location: {filename}")
                 return {}
@@ -46,17 +114,59 @@ def load_json(filename, output_dir):
         logger.error(f"Unexpected error loading JSON file {filepath}: {e}")
         return {}
 
-def save_json(data, filename, output_dir):
-    """Save JSON data to a file."""
+def _replace_file(filepath, payload, sync=False):
+    """
+    Write bytes to a temporary file next to the target and rename it over the target.
+    
+    Readers see either the old or the new file, never a partially written one. The temporary
+    name is unique per process and thread, so concurrent writers do not share it.
+    
+    Args:
+        filepath: Path of the target file
+        payload: Bytes to write
+        sync: Flush the data to disk before the rename
+    """
+    tmp_path = f"{filepath}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def save_json(data, filename, output_dir, indent=None, sync=False):
+    """
+    Save JSON data to a file, replacing it atomically.
+    
+    Args:
+        data: Data to serialize
+        filename: Name of the target file
+        output_dir: Directory of the target file
+        indent: Pretty-print with two-space indentation; by default only when JSON_COMPACT is not set
+        sync: Sync the new file to disk before it replaces the target
+    
+    Returns:
+        True if the file was saved, False otherwise
+    """
     filepath = os.path.join(output_dir, filename)
+    if indent is None:
+        indent = not JSON_COMPACT
     try:
         # Ensure directory exists
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        _ensure_dir(os.path.dirname(filepath))
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
+        option = orjson.OPT_INDENT_2 if indent else None
+        _cache_discard(filepath)
+        _replace_file(filepath, orjson.dumps(data, option=option), sync=sync)
         logger.debug(f"Successfully saved data to {filepath}")
         return True
     except Exception as e:
         logger.error(f"Error saving JSON to {filepath}: {e}")
-        return False
\ No newline at end of file
+        return False
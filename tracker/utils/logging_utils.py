@@ -3,6 +3,11 @@ import logging
 
 def setup_logging():
     """Configure logging for the application"""
+    # The format uses no thread or process fields, so don't collect them for every record
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
@@ -5,120 +5,161 @@ import subprocess
 import time
 import signal
 import atexit
+import selectors
+import socket
 import tempfile
 from pathlib import Path
 import shutil
 from tracker.utils.logging_utils import logger
 
+# Define the project root directory
+PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
+PROXY_CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "code", "proxy_config.json")
+
 # Global variables
 tor_process = None
 temp_torrc_file = None
+# Configuration lines written to temp_torrc_file, so a restart can reuse the file
+_temp_torrc_lines = None
+# Whether _shutdown is registered to run at exit
+_atexit_registered = False
+
+# Tor executable, looked up in PATH once
+_TOR_BIN = shutil.which("tor")
+
+# Longest wait for the proxy port to accept a connection when checking for Tor, in seconds
+PORT_PROBE_TIMEOUT = 0.2
+
+# Longest time to wait for a started Tor process to finish bootstrapping, in seconds
+TOR_BOOTSTRAP_TIMEOUT = 30
+
+# Configuration used when the proxy config file is missing or invalid
+_DEFAULT_CONFIG = {
+    "proxy": {
+        "type": "socks",
+        "host": "127.0.0.1",
+        "port": 9050,
+        "remote_dns": True
+    },
+    "tor": {
+        "auto_start": False,
+        "config": [
+            "SocksPort 9050",
+            "ControlPort 9051",
+            "CookieAuthentication 1",
+            "CircuitBuildTimeout 60",
+            "LearnCircuitBuildTimeout 0",
+            "HiddenServiceStatistics 0",
+            "OptimisticData 1"
+        ]
+    }
+}
+
+# Parsed proxy config by path, with the (mtime, size) of the file it was read from
+_config_cache = {}
 
 def load_proxy_config():
-    """Load proxy configuration from config file"""
-    PROJECT_ROOT = Path(__file__).parent.parent.parent.absolute()
-    PROXY_CONFIG_PATH = os.path.join(PROJECT_ROOT, "config", "code", "proxy_config.json")
+    """
+    Load proxy configuration from config file.
     
+    The parsed file is cached and only read again when its modification time or size
+    changes. The returned configuration is shared and must not be modified.
+    """
     try:
-        if not os.path.exists(PROXY_CONFIG_PATH):
-            logger.warning(f"Proxy config file not found at {PROXY_CONFIG_PATH}. Using default values.")
-            return {
-                "proxy": {
-                    "type": "socks",
-                    "host": "127.0.0.1",
-                    "port": 9050,
-                    "remote_dns": True
-                },
-                "tor": {
-                    "auto_start": False,
-                    "config": [
-                        "SocksPort 9050",
-                        "ControlPort 9051",
-                        "CookieAuthentication 1",
-                        "CircuitBuildTimeout 60",
-                        "LearnCircuitBuildTimeout 0",
-                        "HiddenServiceStatistics 0",
-                        "OptimisticData 1"
-                    ]
-                }
-            }
+        try:
+            stat = os.stat(PROXY_CONFIG_PATH)
+        except FileNotFoundError:
+            logger.warning("Proxy config file not found at %s. Using default values.", PROXY_CONFIG_PATH)
+            return _DEFAULT_CONFIG
+        
+        file_version = (stat.st_mtime_ns, stat.st_size)
+        cached = _config_cache.get(PROXY_CONFIG_PATH)
+        if cached is not None and cached[0] == file_version:
+            return cached[1]
         
         with open(PROXY_CONFIG_PATH, 'r') as f:
-            return json.load(f)
+            config = json.load(f)
+        _config_cache[PROXY_CONFIG_PATH] = (file_version, config)
+        return config
     except Exception as e:
-        logger.error(f"Error loading proxy config: {e}. Using default values.")
-        return {
-            "proxy": {
-                "type": "socks",
-                "host": "127.0.0.1",
-                "port": 9050,
-                "remote_dns": True
-            },
-            "tor": {
-                "auto_start": False,
-                "config": [
-                    "SocksPort 9050",
-                    "ControlPort 9051",
-                    "CookieAuthentication 1",
-                    "CircuitBuildTimeout 60",
-                    "LearnCircuitBuildTimeout 0",
-                    "HiddenServiceStatistics 0",
-                    "OptimisticData 1"
-                ]
-            }
-        }
-
-def create_temp_torrc():
-    """Create a temporary torrc file with our configuration"""
-    global temp_torrc_file
+        logger.error("Error loading proxy config: %s. Using default values.", e)
+        return _DEFAULT_CONFIG
+
+def create_temp_torrc(config=None):
+    """
+    Create a temporary torrc file with our configuration.
+    
+    The file written by an earlier call is reused as long as it exists and the
+    configuration lines did not change.
+    
+    Args:
+        config: Proxy configuration already loaded by the caller (loaded from file if None)
+    """
+    global temp_torrc_file, _temp_torrc_lines
     
     # Load proxy configuration
-    config = load_proxy_config()
+    if config is None:
+        config = load_proxy_config()
     tor_config = config.get("tor", {})
-    config_lines = tor_config.get("config", [
-        "SocksPort 9050",
-        "ControlPort 9051",
-        "CookieAuthentication 1",
-        "CircuitBuildTimeout 60",
-        "LearnCircuitBuildTimeout 0",
-        "HiddenServiceStatistics 0",
-        "OptimisticData 1"
-    ])
+    config_lines = tor_config.get("config", _DEFAULT_CONFIG["tor"]["config"])
+    
+    # Reuse the file of a previous start, or replace it if the configuration changed
+    if temp_torrc_file:
+        if config_lines == _temp_torrc_lines and os.path.exists(temp_torrc_file):
+            return temp_torrc_file
+        cleanup_temp_file()
     
     try:
         # Create a temporary file
-        fd, temp_path = tempfile.mkstemp(suffix='.torrc', text=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.torrc')
         
-        # Write config to the file
-        with os.fdopen(fd, 'w') as f:
-            for line in config_lines:
-                f.write(f"{line}\n")
+        # Write config to the file in a single write
+        try:
+            os.write(fd, "".join(f"{line}\n" for line in config_lines).encode('utf-8'))
+        finally:
+            os.close(fd)
         
-        logger.info(f"Temporary Tor configuration written to {temp_path}")
+        logger.info("Temporary Tor configuration written to %s", temp_path)
         temp_torrc_file = temp_path
+        _temp_torrc_lines = list(config_lines)
         return temp_path
     except Exception as e:
-        logger.error(f"Error creating temporary torrc file: {e}")
+        logger.error("Error creating temporary torrc file: %s", e)
         return None
 
 def cleanup_temp_file():
     """Clean up the temporary torrc file"""
     global temp_torrc_file
     
-    if temp_torrc_file and os.path.exists(temp_torrc_file):
+    if temp_torrc_file:
         try:
-            os.remove(temp_torrc_file)
-            logger.info(f"Removed temporary torrc file: {temp_torrc_file}")
-            temp_torrc_file = None
-        except Exception as e:
-            logger.error(f"Error removing temporary torrc file: {e}")
+            os.unlink(temp_torrc_file)
+            logger.info("Removed temporary torrc file: %s", temp_torrc_file)
+        except FileNotFoundError:
+            # Already gone
+            pass
+        except OSError as e:
+            logger.error("Error removing temporary torrc file: %s", e)
+            return
+        temp_torrc_file = None
 
-def start_tor():
-    """Start Tor with our configuration"""
-    global tor_process
+def _shutdown():
+    """Stop Tor and remove the temporary torrc file when the script exits"""
+    stop_tor()
+    cleanup_temp_file()
+
+def start_tor(config=None):
+    """
+    Start Tor with our configuration.
+    
+    Args:
+        config: Proxy configuration already loaded by the caller (loaded from file if None)
+    """
+    global tor_process, _atexit_registered
     
     # Load proxy configuration
-    config = load_proxy_config()
+    if config is None:
+        config = load_proxy_config()
     tor_config = config.get("tor", {})
     
     # Check if auto-start is enabled
@@ -127,51 +168,141 @@ def start_tor():
         return False
     
     # Check if Tor is installed
-    if shutil.which("tor") is None:
+    if _TOR_BIN is None:
         logger.error("Tor executable not found in PATH. Please install Tor.")
         return False
     
     # Create a temporary torrc file
-    temp_config_path = create_temp_torrc()
+    temp_config_path = create_temp_torrc(config)
     if not temp_config_path:
         logger.error("Failed to create temporary torrc file. Cannot start Tor.")
         return False
     
     try:
         # Start Tor process with the temporary config file
-        start_command = f"tor -f {temp_config_path}"
-        logger.info(f"Starting Tor with command: {start_command}")
+        # Run tor directly instead of through a shell, which also keeps the path from being parsed
+        start_command = [_TOR_BIN, "-f", temp_config_path]
+        logger.info("Starting Tor with command: %s", ' '.join(start_command))
         
         tor_process = subprocess.Popen(
             start_command,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            shell=True,
             text=True
         )
         
-        # Register cleanup functions to stop Tor and remove temp file when the script exits
-        atexit.register(stop_tor)
-        atexit.register(cleanup_temp_file)
+        # Register cleanup to stop Tor and remove temp file when the script exits, once per process
+        if not _atexit_registered:
+            atexit.register(_shutdown)
+            _atexit_registered = True
         
-        # Wait a bit for Tor to start
-        time.sleep(5)
+        # Wait for Tor to bootstrap, waking up as soon as it is ready or exits
+        started = _wait_for_bootstrap(tor_process)
+        if started is None:
+            # No pidfd support, wait a bit for Tor to start
+            time.sleep(5)
+            started = tor_process.poll() is None
         
         # Check if process is still running
-        if tor_process.poll() is None:
+        if started:
             logger.info("Tor process started successfully")
             return True
         else:
             stdout, stderr = tor_process.communicate()
-            logger.error(f"Tor process failed to start: {stderr}")
+            logger.error("Tor process failed to start: %s", stderr)
             cleanup_temp_file()  # Clean up early on failure
             return False
         
     except Exception as e:
-        logger.error(f"Error starting Tor: {e}")
+        logger.error("Error starting Tor: %s", e)
         cleanup_temp_file()  # Clean up early on failure
         return False
 
+def _wait_for_bootstrap(process, timeout=TOR_BOOTSTRAP_TIMEOUT):
+    """
+    Wait until a started Tor process has bootstrapped or exited.
+    
+    A pidfd of the process and its log output are watched together, so the wait ends as
+    soon as Tor logs "Bootstrapped 100%" or exits instead of after a fixed delay.
+    
+    Args:
+        process: Popen object of the Tor process, with its output piped
+        timeout: Longest time to wait in seconds
+    
+    Returns:
+        True if Tor bootstrapped or is still running after the timeout, False if it exited,
+        or None if pidfd_open is not available on this system
+    """
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        return None
+    
+    out_fd = process.stdout.fileno()
+    os.set_blocking(out_fd, False)
+    # End of the previous read, in case the marker is split across two reads
+    tail = b""
+    deadline = time.monotonic() + timeout
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(pidfd, selectors.EVENT_READ)
+            selector.register(out_fd, selectors.EVENT_READ)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning("Tor did not report bootstrapping within %s seconds", timeout)
+                    return True
+                
+                for key, _ in selector.select(remaining):
+                    if key.fd == pidfd:
+                        # The process exited
+                        return False
+                    
+                    chunk = os.read(out_fd, 65536)
+                    if not chunk:
+                        # Output closed, keep waiting for the exit
+                        selector.unregister(out_fd)
+                        continue
+                    if b"Bootstrapped 100%" in tail + chunk:
+                        return True
+                    tail = chunk[-32:]
+    finally:
+        os.close(pidfd)
+        os.set_blocking(out_fd, True)
+
+def _wait_for_exit(process, timeout):
+    """
+    Wait for a process to exit, sleeping on a pidfd instead of polling where it is available.
+    
+    Args:
+        process: Popen object of the process
+        timeout: Longest time to wait in seconds
+    
+    Returns:
+        True if the process exited within the timeout, False otherwise
+    """
+    try:
+        pidfd = os.pidfd_open(process.pid)
+    except (AttributeError, OSError):
+        # No pidfd support, or the process was already reaped
+        try:
+            process.wait(timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(pidfd, selectors.EVENT_READ)
+            if not selector.select(timeout):
+                return False
+    finally:
+        os.close(pidfd)
+    
+    # The process has exited, so this only reaps it
+    process.wait()
+    return True
+
 def stop_tor():
     """Stop the Tor process if it's running"""
     global tor_process
@@ -181,46 +312,48 @@ def stop_tor():
         try:
             # Try to terminate gracefully
             tor_process.terminate()
-            tor_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            # If it doesn't respond, force kill
-            logger.warning("Tor process did not terminate gracefully, forcing kill")
-            tor_process.kill()
+            if not _wait_for_exit(tor_process, 5):
+                # If it doesn't respond, force kill
+                logger.warning("Tor process did not terminate gracefully, forcing kill")
+                tor_process.kill()
+                tor_process.wait()
         except Exception as e:
-            logger.error(f"Error stopping Tor process: {e}")
+            logger.error("Error stopping Tor process: %s", e)
         
         tor_process = None
         logger.info("Tor process stopped")
 
-def is_tor_running():
-    """Check if Tor is already running on the configured port"""
-    config = load_proxy_config()
-    port = config.get("proxy", {}).get("port", 9050)
+def is_tor_running(config=None):
+    """
+    Check if Tor is already running on the configured port.
+    
+    Args:
+        config: Proxy configuration already loaded by the caller (loaded from file if None)
+    """
+    if config is None:
+        config = load_proxy_config()
+    proxy_config = config.get("proxy", {})
+    host = proxy_config.get("host", "127.0.0.1")
+    port = proxy_config.get("port", 9050)
     
     try:
-        # Simple check using subprocess to see if the port is in use
-        result = subprocess.run(
-            f"lsof -i :{port} | grep LISTEN",
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        # If the command returned output, something is listening on the port
-        if result.stdout.strip():
-            logger.info(f"Tor appears to be already running on port {port}")
-            return True
-        else:
-            logger.info(f"No process found listening on port {port}")
-            return False
+        # Connect to the proxy port the browser will use instead of listing the listening sockets
+        with socket.create_connection((host, port), timeout=PORT_PROBE_TIMEOUT):
+            pass
+        logger.info("Tor appears to be already running on port %s", port)
+        return True
+    except OSError:
+        logger.info("No process found listening on port %s", port)
+        return False
     except Exception as e:
-        logger.error(f"Error checking if Tor is running: {e}")
+        logger.error("Error checking if Tor is running: %s", e)
         return False
 
 def ensure_tor_running():
     """Ensure Tor is running, starting it if necessary"""
-    if is_tor_running():
+    # Load the configuration once for the check and the start
+    config = load_proxy_config()
+    if is_tor_running(config):
         return True
     
-    return start_tor()
\ No newline at end of file
+    return start_tor(config)
\ No newline at end of file